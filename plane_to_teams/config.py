@@ -3,11 +3,53 @@ Configuration management for the application.
 """
 import os
 from dataclasses import dataclass, field
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 
-from dotenv import load_dotenv
+# Le fichier .env n'est lu qu'une seule fois par processus
+_DOTENV_LOADED = False
 
-@dataclass
+# Champs obligatoires : (variable d'environnement, attribut)
+_REQUIRED_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ('PLANE_API_TOKEN', 'plane_api_token'),
+    ('PLANE_BASE_URL', 'plane_base_url'),
+    ('PLANE_WORKSPACE', 'plane_workspace'),
+    ('PLANE_PROJECT_ID', 'plane_project_id'),
+    ('TEAMS_WEBHOOK_URL', 'teams_webhook_url'),
+)
+
+# Heures de notification acceptées (format 24h)
+_HOUR_RANGE = range(24)
+
+# Champs entiers : (variable d'environnement, attribut). Une valeur non
+# numérique est chargée comme None, puis rejetée par validate()
+_INTEGER_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ('NOTIFICATION_HOUR', 'notification_hour'),
+    ('MAX_RETRIES', 'max_retries'),
+    ('SYNC_INTERVAL', 'sync_interval'),
+)
+
+
+def _load_dotenv_once() -> None:
+    """Load the .env file on first use only."""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        # Import différé : python-dotenv n'est chargé que s'il sert
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _DOTENV_LOADED = True
+
+
+def _env_int(env, name: str, default: str) -> Optional[int]:
+    """Parse an integer environment variable, returning None on error."""
+    try:
+        return int(env.get(name, default))
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
 class Config:
     """Application configuration."""
     plane_api_token: str
@@ -22,21 +64,27 @@ class Config:
     sync_interval: int = field(default=10)
 
     @classmethod
+    @lru_cache(maxsize=1)
     def from_env(cls) -> 'Config':
-        """Load configuration from environment variables."""
-        load_dotenv()
+        """Load configuration from environment variables.
+
+        The result is cached: use `Config.from_env.cache_clear()` to reload
+        the configuration after the environment has changed.
+        """
+        _load_dotenv_once()
+        env = os.environ
 
         return cls(
-            plane_api_token=os.getenv('PLANE_API_TOKEN', ''),
-            plane_base_url=os.getenv('PLANE_BASE_URL', ''),
-            plane_workspace=os.getenv('PLANE_WORKSPACE', ''),
-            plane_project_id=os.getenv('PLANE_PROJECT_ID', ''),
-            teams_webhook_url=os.getenv('TEAMS_WEBHOOK_URL', ''),
-            notification_hour=int(os.getenv('NOTIFICATION_HOUR', '8')),
-            max_retries=int(os.getenv('MAX_RETRIES', '3')),
-            log_level=os.getenv('LOG_LEVEL', 'INFO'),
-            log_file=os.getenv('LOG_FILE', 'plane_to_teams.log'),
-            sync_interval=int(os.getenv('SYNC_INTERVAL', '10'))
+            plane_api_token=env.get('PLANE_API_TOKEN', ''),
+            plane_base_url=env.get('PLANE_BASE_URL', ''),
+            plane_workspace=env.get('PLANE_WORKSPACE', ''),
+            plane_project_id=env.get('PLANE_PROJECT_ID', ''),
+            teams_webhook_url=env.get('TEAMS_WEBHOOK_URL', ''),
+            notification_hour=_env_int(env, 'NOTIFICATION_HOUR', '8'),
+            max_retries=_env_int(env, 'MAX_RETRIES', '3'),
+            log_level=env.get('LOG_LEVEL', 'INFO'),
+            log_file=env.get('LOG_FILE', 'plane_to_teams.log'),
+            sync_interval=_env_int(env, 'SYNC_INTERVAL', '10')
         )
 
     def validate(self) -> Optional[str]:
@@ -47,21 +95,19 @@ class Config:
             Optional[str]: Error message if validation fails, None otherwise.
         """
         # Check required fields
-        required_fields = {
-            'PLANE_API_TOKEN': self.plane_api_token,
-            'PLANE_BASE_URL': self.plane_base_url,
-            'PLANE_WORKSPACE': self.plane_workspace,
-            'PLANE_PROJECT_ID': self.plane_project_id,
-            'TEAMS_WEBHOOK_URL': self.teams_webhook_url
-        }
-
-        for env_var, value in required_fields.items():
-            if not value:
+        for env_var, attr in _REQUIRED_FIELDS:
+            if not getattr(self, attr):
                 field_name = env_var.replace('_', ' ').title()
                 return f"{field_name} is required"
 
+        # Check integer fields that could not be parsed
+        for env_var, attr in _INTEGER_FIELDS:
+            if getattr(self, attr) is None:
+                field_name = env_var.replace('_', ' ').title()
+                return f"{field_name} must be an integer"
+
         # Check notification hour
-        if not (0 <= self.notification_hour <= 23):
+        if self.notification_hour not in _HOUR_RANGE:
             return "Notification Hour must be between 0 and 23"
 
         # Check max retries
@@ -1,16 +1,90 @@
 """
 Logging configuration for the application.
 """
+import atexit
+import gzip
 import logging
+import os
+import queue
+import shutil
 import sys
-from logging.handlers import RotatingFileHandler
-from pythonjsonlogger import jsonlogger
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
 
 from plane_to_teams.config import Config
 
+
+@lru_cache(maxsize=1)
+def _json_formatter() -> logging.Formatter:
+    """Build the JSON formatter on first use and share it afterwards."""
+    # Import différé : python-json-logger n'est chargé que s'il sert
+    from pythonjsonlogger import jsonlogger
+
+    return jsonlogger.JsonFormatter(
+        '%(asctime)s %(name)s %(levelname)s %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+# Formatter partagé entre toutes les configurations
+_CONSOLE_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# Listener qui écrit les logs depuis un thread dédié
+_listener: Optional[QueueListener] = None
+
+
+class _LocalQueueHandler(QueueHandler):
+    """Queue handler that enqueues records without formatting them.
+
+    The listener runs in the same process, so records do not need to be
+    pickled. Keeping them untouched lets the file and console formatters
+    render exc_info themselves.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def shutdown_logging() -> None:
+    """Stop the background log listener and flush pending records."""
+    global _listener
+    if _listener is not None:
+        # Plus aucun record ne doit aller dans une queue que personne ne vide
+        root_logger = logging.getLogger()
+        for handler in root_logger.handlers[:]:
+            if isinstance(handler, _LocalQueueHandler):
+                root_logger.removeHandler(handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def _gzip_namer(name: str) -> str:
+    """Name rotated log files with a .gz suffix."""
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """Compress a rotated log file and remove the original."""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
 def setup_logging(config: Config) -> logging.Logger:
     """
     Setup application logging.
+
+    Records are pushed to an in-memory queue by the root logger and written
+    to the file and console handlers by a background listener thread, so
+    logging calls never block on disk or terminal I/O.
     
     Args:
         config: Application configuration
@@ -27,35 +101,41 @@ def setup_logging(config: Config) -> logging.Logger:
     except AttributeError:
         raise ValueError(f"Invalid log level: {config.log_level}")
 
+    # Stop the listener of a previous configuration
+    shutdown_logging()
+
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
 
     # Clear any existing handlers
     root_logger.handlers = []
 
-    # Create formatters
-    json_formatter = jsonlogger.JsonFormatter(
-        '%(asctime)s %(name)s %(levelname)s %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-
     # Setup file handler
     file_handler = RotatingFileHandler(
         config.log_file,
         maxBytes=10485760,  # 10MB
         backupCount=5
     )
-    file_handler.setFormatter(json_formatter)
-    root_logger.addHandler(file_handler)
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(_json_formatter())
 
     # Setup console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    console_handler.setFormatter(_CONSOLE_FORMATTER)
+
+    # Route records through a queue drained by a background thread
+    global _listener
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(_LocalQueueHandler(log_queue))
+    _listener = QueueListener(
+        log_queue,
+        file_handler,
+        console_handler,
+        respect_handler_level=True
+    )
+    _listener.start()
 
     root_logger.info("Logging configured with level %s", config.log_level)
 
-    return root_logger 
\ No newline at end of file
+    return root_logger
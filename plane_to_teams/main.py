@@ -1,11 +1,100 @@
 """
 Main application entry point.
 """
+import asyncio
 import logging
+import os
+import signal
 import sys
 
+import aiohttp
+
 from plane_to_teams.config import Config
 from plane_to_teams.logger import setup_logging
+from plane_to_teams.plane_client import PlaneClient
+from plane_to_teams.sync_service import SyncService
+from plane_to_teams.teams_client import TeamsClient
+
+logger = logging.getLogger(__name__)
+
+
+def signal_handler(signum: int, stop_event: asyncio.Event):
+    """Gestionnaire de signaux pour arrêter proprement le service."""
+    logger.info("Signal reçu: %s", signum)
+    stop_event.set()
+
+
+def _create_session() -> aiohttp.ClientSession:
+    """Create the HTTP session shared by the Plane and Teams clients.
+
+    The session lives as long as the application so that its connection
+    pool survives between scheduled syncs.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=20,
+        keepalive_timeout=300,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def _create_service(config: Config, plane_client: PlaneClient, teams_client: TeamsClient) -> SyncService:
+    """Create the sync service shared by the scheduled and manual runs."""
+    return SyncService(
+        plane_client=plane_client,
+        teams_client=teams_client,
+        state_file=os.getenv('STATE_FILE', '.state.json'),
+        notification_hour=config.notification_hour,
+        max_retries=config.max_retries
+    )
+
+
+async def run_once(config: Config) -> None:
+    """
+    Run a single forced synchronization.
+
+    Args:
+        config: Application configuration
+    """
+    async with _create_session() as session:
+        plane_client = PlaneClient(config, session=session)
+        teams_client = TeamsClient(config.teams_webhook_url, session=session)
+        service = _create_service(config, plane_client, teams_client)
+
+        logger.info("Démarrage de la synchronisation manuelle")
+        await service.sync(force=True)
+        logger.info("Synchronisation terminée")
+
+
+async def run_forever(config: Config) -> None:
+    """
+    Run the scheduled sync service until SIGINT or SIGTERM is received.
+
+    Args:
+        config: Application configuration
+    """
+    async with _create_session() as session:
+        plane_client = PlaneClient(config, session=session)
+        teams_client = TeamsClient(config.teams_webhook_url, session=session)
+        service = _create_service(config, plane_client, teams_client)
+
+        # Configurer les gestionnaires de signaux
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, signal_handler, signum, stop_event)
+
+        # Démarrer le service
+        logger.info("Démarrage du service...")
+        service.start()
+
+        try:
+            # Maintenir le processus en vie jusqu'à la réception d'un signal
+            await stop_event.wait()
+        finally:
+            service.stop()
+
 
 def main() -> int:
     """
@@ -29,7 +118,7 @@ def main() -> int:
         
         logging.info("Application started")
         
-        # TODO: Implement main application logic
+        asyncio.run(run_forever(config))
         
         return 0
         
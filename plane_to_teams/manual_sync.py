@@ -3,21 +3,13 @@ Script pour exécuter manuellement la synchronisation entre Plane et Teams.
 """
 import asyncio
 import logging
-from datetime import datetime
 
 from plane_to_teams.config import Config
 from plane_to_teams.logger import setup_logging
-from plane_to_teams.plane_client import PlaneClient
-from plane_to_teams.teams_client import TeamsClient
-from plane_to_teams.sync_service import SyncService
+from plane_to_teams.main import run_once
 
 async def main():
     """Point d'entrée du script."""
-    # Configurer le logging
-    logging.basicConfig(
-        level=logging.INFO,  # Niveau de log en INFO
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
     logger = logging.getLogger(__name__)
     
     # Charger la configuration
@@ -26,25 +18,14 @@ async def main():
     # Valider la configuration
     error = config.validate()
     if error:
-        logger.error(f"Erreur de configuration: {error}")
+        logger.error("Erreur de configuration: %s", error)
         return
     
-    # Initialiser les clients
-    plane_client = PlaneClient(config)
-    teams_client = TeamsClient(config.teams_webhook_url)
-    
-    # Créer le service de synchronisation
-    sync_service = SyncService(
-        plane_client=plane_client,
-        teams_client=teams_client,
-        notification_hour=config.notification_hour,
-        max_retries=config.max_retries
-    )
+    # Configurer le logging avant toute autre trace
+    setup_logging(config)
     
     # Forcer la synchronisation
-    logger.info("Démarrage de la synchronisation manuelle")
-    await sync_service.sync(force=True)
-    logger.info("Synchronisation terminée")
+    await run_once(config)
 
 if __name__ == "__main__":
     asyncio.run(main()) 
@@ -1,18 +1,58 @@
 """
 Plane API client implementation.
 """
-import json
+import asyncio
 import logging
+import sys
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import aiohttp
-from aiohttp import ClientError
+import orjson
+from aiohttp import ClientError, ClientResponse, ClientResponseError
 
 from plane_to_teams.config import Config
 
+# Champs optionnels d'une issue, copiés tels quels depuis la réponse de l'API
+_ISSUE_OPTIONAL_FIELDS = (
+    'description_html',
+    'estimate_point',
+    'start_date',
+    'target_date',
+    'completed_at',
+)
 
-@dataclass
+
+def _intern(value):
+    """Intern a string value, passing any other value through unchanged."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _pretty_json(data) -> str:
+    """Serialize data as indented JSON for logging."""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+
+
+async def _raise_for_error(response: ClientResponse) -> None:
+    """Raise a ClientResponseError if the response is an error.
+
+    The body is read only once and logged before raising.
+    """
+    if response.status < 400:
+        return
+
+    body = await response.read()
+    logging.error("API error: %s - %s", response.status, body[:512].decode('utf-8', 'replace'))
+    raise ClientResponseError(
+        response.request_info,
+        response.history,
+        status=response.status,
+        message=response.reason,
+        headers=response.headers
+    )
+
+
+@dataclass(slots=True)
 class PlaneState:
     """Represents a Plane state."""
     id: str
@@ -45,12 +85,12 @@ class PlaneState:
                 default=bool(data.get('default', False))  # Default state flag
             )
         except (KeyError, ValueError, TypeError) as e:
-            logging.error(f"Error parsing state data: {e}")
-            logging.error(f"Raw state data: {json.dumps(data, indent=2)}")
+            logging.error("Error parsing state data: %s", e)
+            logging.error("Raw state data: %s", _pretty_json(data))
             raise ValueError(f"Invalid state data: {e}")
 
 
-@dataclass
+@dataclass(slots=True)
 class PlaneIssue:
     """Represents a Plane issue."""
     id: str
@@ -72,68 +112,87 @@ class PlaneIssue:
     @classmethod
     def from_api_response(cls, data: Dict) -> 'PlaneIssue':
         """Create a PlaneIssue instance from API response data."""
-        logging.debug("Creating PlaneIssue from data: %s", json.dumps(data, indent=2))
-        
-        # Debug logs for labels and assignees
-        logging.debug("Labels data: %s", json.dumps(data.get('labels', []), indent=2))
-        logging.debug("Assignees data: %s", json.dumps(data.get('assignees', []), indent=2))
+        # Ne sérialiser les données que si le niveau DEBUG est actif
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Creating PlaneIssue from data: %s", _pretty_json(data))
+            logging.debug("Labels data: %s", _pretty_json(data.get('labels', [])))
+            logging.debug("Assignees data: %s", _pretty_json(data.get('assignees', [])))
         
+        # Les valeurs répétées d'une issue à l'autre sont internées pour
+        # ne garder qu'une seule chaîne par valeur distincte
         return cls(
             id=data['id'],
             name=data['name'],
-            description_html=data.get('description_html'),
-            priority=data.get('priority', 'none'),
-            state=data['state'],
+            priority=_intern(data.get('priority', 'none')),
+            state=_intern(data['state']),
             created_at=data['created_at'],
             updated_at=data['updated_at'],
-            estimate_point=data.get('estimate_point'),
-            start_date=data.get('start_date'),
-            target_date=data.get('target_date'),
-            completed_at=data.get('completed_at'),
             sequence_id=data['sequence_id'],
-            project_id=data['project'],
-            labels=data.get('labels', []),
-            assignees=data.get('assignees', [])
+            project_id=_intern(data['project']),
+            labels=[_intern(label) for label in data.get('labels', [])],
+            assignees=[_intern(assignee) for assignee in data.get('assignees', [])],
+            **{key: data.get(key) for key in _ISSUE_OPTIONAL_FIELDS}
         )
 
 
 class PlaneClient:
     """Client for interacting with the Plane API."""
 
-    def __init__(self, config: Config):
-        """Initialize the Plane API client."""
+    def __init__(self, config: Config, session: Optional[aiohttp.ClientSession] = None):
+        """Initialize the Plane API client.
+
+        Args:
+            config: Application configuration
+            session: Optional session shared with other clients. It is not
+                closed by the client, its owner is responsible for it.
+        """
         self.config = config
         self.headers = {
             'X-API-Key': config.plane_api_token,
             'Content-Type': 'application/json',
         }
-        self.session = None
+        self.session = session
+        self._owns_session = session is None
+
+        # Les URLs ne dépendent que de la configuration : calculées une seule fois
+        project_url = f"{config.plane_base_url}/workspaces/{config.plane_workspace}/projects/{config.plane_project_id}"
+        self._issues_url = f"{project_url}/issues/"
+        self._states_url = f"{project_url}/states/"
         logging.info("PlaneClient initialized with base URL: %s", config.plane_base_url)
 
+    async def __aenter__(self) -> 'PlaneClient':
+        """Open the client session."""
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Close the client session."""
+        await self.close()
+
     async def _ensure_session(self):
-        """Ensure we have an active session."""
-        if self.session is None:
-            self.session = aiohttp.ClientSession(headers=self.headers)
+        """Ensure we have an active session.
+
+        The session keeps its connections alive so that successive calls
+        reuse the same TCP/TLS connection to the Plane API.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=10,
+                keepalive_timeout=75,
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+            # Session créée par le client (y compris à la place d'une session
+            # partagée déjà fermée) : c'est à lui de la fermer
+            self._owns_session = True
         return self.session
 
     async def close(self):
-        """Close the client session."""
-        if self.session:
+        """Close the client session, unless it is shared."""
+        if self.session and self._owns_session:
             await self.session.close()
             self.session = None
 
-    def _get_issues_url(self) -> str:
-        """Get the URL for issues endpoint."""
-        url = f"{self.config.plane_base_url}/workspaces/{self.config.plane_workspace}/projects/{self.config.plane_project_id}/issues/"
-        logging.debug("Issues URL: %s", url)
-        return url
-
-    def _get_states_url(self) -> str:
-        """Get the URL for states endpoint."""
-        url = f"{self.config.plane_base_url}/workspaces/{self.config.plane_workspace}/projects/{self.config.plane_project_id}/states/"
-        logging.debug("States URL: %s", url)
-        return url
-
     async def get_states(self) -> List[PlaneState]:
         """
         Fetch all states from Plane.
@@ -147,21 +206,20 @@ class PlaneClient:
         """
         try:
             logging.info("Fetching states from Plane API...")
-            url = self._get_states_url()
+            url = self._states_url
             logging.debug("Using URL: %s", url)
             
             session = await self._ensure_session()
             logging.debug("Session created with headers: %s", self.headers)
             
-            async with session.get(url) as response:
+            async with session.get(url, headers=self.headers) as response:
                 logging.debug("Response status: %s", response.status)
-                if response.status >= 400:
-                    error_text = await response.text()
-                    logging.error("API error: %s - %s", response.status, error_text)
-                    response.raise_for_status()
+                await _raise_for_error(response)
                 
-                response_data = await response.json()
-                logging.debug("Response data: %s", json.dumps(response_data, indent=2))
+                response_data = await response.json(loads=orjson.loads)
+                debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+                if debug_enabled:
+                    logging.debug("Response data: %s", _pretty_json(response_data))
                 
                 # L'API retourne un objet avec un champ 'results'
                 if not isinstance(response_data, dict) or 'results' not in response_data:
@@ -174,7 +232,8 @@ class PlaneClient:
                 states = []
                 for state_data in states_data:
                     try:
-                        logging.debug("Processing state data: %s", json.dumps(state_data, indent=2))
+                        if debug_enabled:
+                            logging.debug("Processing state data: %s", _pretty_json(state_data))
                         state = PlaneState.from_api_response(state_data)
                         logging.info("State: '%s' (Group: %s, Sequence: %d)", 
                                    state.name, 
@@ -211,38 +270,39 @@ class PlaneClient:
         """
         try:
             logging.info("Fetching issues from Plane API...")
-            url = self._get_issues_url()
+            url = self._issues_url
             session = await self._ensure_session()
             
-            async with session.get(url) as response:
-                if response.status >= 400:
-                    error_text = await response.text()
-                    logging.error("API error: %s - %s", response.status, error_text)
-                    response.raise_for_status()
+            async with session.get(url, headers=self.headers) as response:
+                await _raise_for_error(response)
                 
-                response_data = await response.json()
+                response_data = await response.json(loads=orjson.loads)
                 
                 if isinstance(response_data, dict):
                     issues_data = response_data.get('results', [])
                 else:
                     issues_data = response_data
                 
-                logging.info("Received %d issues from API", len(issues_data))
-                
+                debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
                 issues = []
                 for issue_data in issues_data:
                     try:
                         issue = PlaneIssue.from_api_response(issue_data)
-                        logging.info("Issue #%d: '%s' (Priority: %s, State: %s)", 
-                                   issue.sequence_id, 
-                                   issue.name, 
-                                   issue.priority,
-                                   issue.state)
+                        if debug_enabled:
+                            logging.debug("Issue #%d: '%s' (Priority: %s, State: %s)", 
+                                       issue.sequence_id, 
+                                       issue.name, 
+                                       issue.priority,
+                                       issue.state)
                         issues.append(issue)
                     except Exception as e:
                         logging.error("Failed to parse issue data: %s", str(e))
-                        logging.error("Raw issue data: %s", json.dumps(issue_data, indent=2))
+                        logging.error("Raw issue data: %s", issue_data)
                 
+                # Une seule ligne de résumé plutôt qu'une ligne par issue
+                logging.info("Fetched %d issues: %s",
+                             len(issues),
+                             ', '.join(f"#{issue.sequence_id}" for issue in issues[:20]))
                 return issues
         
         except ClientError as e:
@@ -252,6 +312,30 @@ class PlaneClient:
             logging.error("Error processing issues data: %s", str(e))
             raise
 
+    async def fetch_all(self) -> Tuple[List[PlaneState], List[PlaneIssue]]:
+        """
+        Fetch states and issues from Plane concurrently.
+
+        Both requests share the client session and run at the same time,
+        so the sync only waits for the slowest of the two. If one of them
+        fails, the other one is cancelled.
+
+        Returns:
+            Tuple[List[PlaneState], List[PlaneIssue]]: States and issues
+
+        Raises:
+            ClientError: If one of the API requests fails
+            ValueError: If the states response data is invalid
+        """
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                states_task = task_group.create_task(self.get_states())
+                issues_task = task_group.create_task(self.get_issues())
+        except ExceptionGroup as e:
+            # Remonter l'erreur d'origine, attendue par les appelants
+            raise e.exceptions[0] from None
+        return states_task.result(), issues_task.result()
+
     async def get_issue(self, issue_id: str) -> Optional[PlaneIssue]:
         """
         Fetch a specific issue from Plane.
@@ -267,20 +351,17 @@ class PlaneClient:
         """
         try:
             logging.info("Fetching issue %s...", issue_id)
-            url = f"{self._get_issues_url()}{issue_id}/"
+            url = f"{self._issues_url}{issue_id}/"
             session = await self._ensure_session()
             
-            async with session.get(url) as response:
+            async with session.get(url, headers=self.headers) as response:
                 if response.status == 404:
                     logging.warning("Issue %s not found", issue_id)
                     return None
                 
-                if response.status >= 400:
-                    error_text = await response.text()
-                    logging.error("API error: %s - %s", response.status, error_text)
-                    response.raise_for_status()
+                await _raise_for_error(response)
                 
-                issue_data = await response.json()
+                issue_data = await response.json(loads=orjson.loads)
                 
                 issue = PlaneIssue.from_api_response(issue_data)
                 logging.debug("Successfully fetched issue #%d: '%s'", 
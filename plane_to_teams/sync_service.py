@@ -3,32 +3,50 @@ Service de synchronisation entre Plane et Teams.
 Gère l'envoi quotidien des notifications à 8h.
 """
 import asyncio
-import json
 import logging
 import os
-from datetime import datetime, time
+import tempfile
+from datetime import datetime, time, timedelta
 from pathlib import Path
+from time import monotonic
 from typing import Dict, List, Optional
 
+import orjson
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
-from plane_to_teams.plane_client import PlaneClient, PlaneIssue
+from plane_to_teams.plane_client import PlaneClient, PlaneIssue, PlaneState
 from plane_to_teams.teams_client import TeamsClient
 from plane_to_teams.teams_formatter import format_issues
 
 logger = logging.getLogger(__name__)
 
+# Délai minimal entre deux écritures du state sur disque (en secondes)
+STATE_WRITE_DELAY = 10
+
+# Durée maximale de la récupération des states et des issues (en secondes)
+FETCH_TIMEOUT = 30
+
+# Durée de validité des états Plane mis en cache (en secondes). Juste sous
+# l'intervalle du job quotidien : chaque sync quotidienne récupère des états
+# à jour (noms, groupes), et les syncs d'une même journée (rattrapage au
+# démarrage, syncs manuelles) réutilisent ceux déjà récupérés
+STATE_CACHE_TTL = 23 * 3600
+
 class SyncService:
     """Service de synchronisation entre Plane et Teams."""
     
+    # Horloge du service, remplaçable dans les tests
+    _now = staticmethod(datetime.now)
+    
     def __init__(
         self,
         plane_client: PlaneClient,
         teams_client: TeamsClient,
         state_file: str = ".state.json",
         notification_hour: int = 8,
-        max_retries: int = 3
+        max_retries: int = 3,
+        scheduler: Optional[AsyncIOScheduler] = None
     ):
         """Initialize the sync service.
         
@@ -38,29 +56,44 @@ class SyncService:
             state_file: Chemin vers le fichier de state
             notification_hour: Heure d'envoi de la notification (default: 8)
             max_retries: Nombre maximum de tentatives en cas d'erreur
+            scheduler: Scheduler des jobs (default: nouvel AsyncIOScheduler)
         """
         self.plane_client = plane_client
         self.teams_client = teams_client
         self.state_file = Path(state_file)
         self.notification_hour = time(notification_hour)
         self.max_retries = max_retries
-        self.scheduler = AsyncIOScheduler()
+        self.scheduler = scheduler or AsyncIOScheduler()
         
         # Charger ou créer le state
         self.state = self._load_state()
+        self._dirty = False
+        self._last_write: Optional[float] = None
+        self._write_lock = asyncio.Lock()
+        
+        # Etats Plane indexés par id, avec la date de leur récupération
+        self._state_map: Optional[Dict[str, PlaneState]] = None
+        self._state_map_fetched_at = 0.0
+        
+        # Dernière sync déjà convertie en datetime, avec la chaîne d'origine
+        self._last_sync_iso: Optional[str] = None
+        self._last_sync_dt: Optional[datetime] = None
         
     def _load_state(self) -> Dict:
         """Charge le state depuis le fichier ou crée un nouveau state.
         
+        Lecture synchrone : elle n'a lieu qu'une fois, dans __init__, avant
+        que la boucle asyncio ne traite des tâches.
+        
         Returns:
             Dict: Le state chargé ou un nouveau state
         """
-        if self.state_file.exists():
-            try:
-                with open(self.state_file) as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Erreur lors du chargement du state: {e}")
+        try:
+            data = self._read_state()
+            if data is not None:
+                return orjson.loads(data)
+        except Exception as e:
+            logger.error("Erreur lors du chargement du state: %s", e)
         
         # State par défaut
         return {
@@ -71,13 +104,155 @@ class SyncService:
             "last_error": None
         }
     
-    def _save_state(self):
-        """Sauvegarde le state dans le fichier."""
+    async def _save_state(self, force: bool = False):
+        """Sauvegarde le state dans le fichier.
+        
+        Les écritures rapprochées de moins de STATE_WRITE_DELAY secondes sont
+        différées : le state est marqué comme modifié et un appel unique à
+        _flush_state est planifié à la fin du délai. Le fichier est écrit
+        dans un fichier temporaire puis renommé, pour ne jamais laisser un
+        state tronqué.
+        
+        Args:
+            force: Ecrire immédiatement, même si la dernière écriture est récente
+        """
+        now = monotonic()
+        if not force and self._last_write is not None and now - self._last_write < STATE_WRITE_DELAY:
+            self._dirty = True
+            self._schedule_flush(STATE_WRITE_DELAY - (now - self._last_write))
+            return
+        
+        # Le créneau est réservé avant l'écriture : une sauvegarde lancée
+        # pendant qu'elle est en cours est différée au lieu d'écrire en même temps
+        self._last_write = now
+        self._dirty = False
+        data = self._dump_state()
+        
+        # Les écritures disques bloquantes sur la boucle asyncio retardent les
+        # autres tâches (requêtes HTTP, scheduler) : elles passent par un thread
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
+            async with self._write_lock:
+                await asyncio.to_thread(self._write_state, data)
         except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde du state: {e}")
+            self._dirty = True
+            logger.error("Erreur lors de la sauvegarde du state: %s", e)
+    
+    def _read_state(self) -> Optional[bytes]:
+        """Lit le state sérialisé depuis le fichier.
+        
+        Returns:
+            Optional[bytes]: Le state sérialisé, None si le fichier n'existe pas
+        """
+        try:
+            return self.state_file.read_bytes()
+        except FileNotFoundError:
+            return None
+    
+    def _dump_state(self) -> bytes:
+        """Sérialise le state en JSON indenté.
+        
+        Returns:
+            bytes: Le state sérialisé
+        """
+        return orjson.dumps(self.state, option=orjson.OPT_INDENT_2)
+    
+    def _write_state(self, data: bytes):
+        """Ecrit le state sérialisé dans le fichier, de façon atomique.
+        
+        Args:
+            data: Le state sérialisé en JSON
+        """
+        # Fichier temporaire unique, dans le même dossier pour que le
+        # renommage reste atomique
+        tmp_file = tempfile.NamedTemporaryFile(
+            dir=self.state_file.parent,
+            prefix=self.state_file.name + '.',
+            suffix='.tmp',
+            delete=False
+        )
+        try:
+            with tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_file.name, self.state_file)
+        except BaseException:
+            os.unlink(tmp_file.name)
+            raise
+    
+    def _schedule_flush(self, delay: float):
+        """Planifie une écriture unique du state différé.
+        
+        Une écriture déjà planifiée est remplacée, il n'y en a qu'une à la fois.
+        
+        Args:
+            delay: Délai avant l'écriture (en secondes)
+        """
+        self.scheduler.add_job(
+            self._flush_state,
+            'date',
+            run_date=self._now() + timedelta(seconds=delay),
+            id='flush_state',
+            replace_existing=True
+        )
+    
+    async def _flush_state(self):
+        """Ecrit le state s'il a été modifié depuis la dernière écriture."""
+        if self._dirty:
+            await self._save_state(force=True)
+    
+    def _set_state_map(self, states: List[PlaneState]):
+        """Met en cache les états Plane indexés par id.
+        
+        Une liste vide n'est pas mise en cache, pour être redemandée à la
+        prochaine sync.
+        
+        Args:
+            states: Les états récupérés depuis Plane
+        """
+        if states:
+            self._state_map = {state.id: state for state in states}
+            self._state_map_fetched_at = monotonic()
+        else:
+            self._state_map = None
+    
+    async def _fetch_issues(self) -> List[PlaneIssue]:
+        """Récupère les issues, et les états s'ils ne sont plus en cache.
+        
+        Les états changent rarement : ils ne sont redemandés à Plane qu'au
+        bout de STATE_CACHE_TTL secondes, ou si une issue est dans un état
+        inconnu du cache.
+        
+        Returns:
+            List[PlaneIssue]: Les issues du projet
+            
+        Raises:
+            TimeoutError: Si la récupération prend plus de FETCH_TIMEOUT secondes
+        """
+        # Un seul délai pour toutes les requêtes, que les états soient en cache ou non
+        async with asyncio.timeout(FETCH_TIMEOUT):
+            if self._state_map is None or monotonic() - self._state_map_fetched_at > STATE_CACHE_TTL:
+                # Récupération des states et des issues en parallèle
+                states, issues = await self.plane_client.fetch_all()
+                self._set_state_map(states)
+                return issues
+            
+            issues = await self.plane_client.get_issues()
+            if any(issue.state not in self._state_map for issue in issues):
+                self._set_state_map(await self.plane_client.get_states())
+            return issues
+    
+    def _last_sync(self) -> Optional[datetime]:
+        """Retourne la date de dernière sync du state.
+        
+        La chaîne ISO n'est reconvertie que lorsqu'elle a changé.
+        
+        Returns:
+            Optional[datetime]: La date de dernière sync, None si jamais synchronisé
+        """
+        last_sync_iso = self.state["last_sync"]
+        if last_sync_iso != self._last_sync_iso:
+            self._last_sync_dt = datetime.fromisoformat(last_sync_iso) if last_sync_iso else None
+            self._last_sync_iso = last_sync_iso
+        return self._last_sync_dt
     
     def _should_sync(self) -> bool:
         """Vérifie si une synchronisation doit être effectuée.
@@ -85,28 +260,19 @@ class SyncService:
         Returns:
             bool: True si une sync est nécessaire
         """
-        now = datetime.now()
+        now = self._now()
+        last_sync = self._last_sync()
         
         # Si pas de dernier sync, on doit synchro
-        if not self.state["last_sync"]:
+        if last_sync is None:
             return True
-            
-        # Convertir last_sync en datetime
-        last_sync = datetime.fromisoformat(self.state["last_sync"])
         
-        # Si on est un jour différent et qu'il est après l'heure de notification
-        if last_sync.date() < now.date() and now.time() >= self.notification_hour:
-            return True
-            
-        # Si on est le même jour, avant l'heure de notification, et que le dernier sync était avant l'heure de notification
-        if (last_sync.date() == now.date() and 
-            now.time() >= self.notification_hour and 
-            last_sync.time() < self.notification_hour):
-            return True
-            
-        return False
+        # Une fois l'heure de notification passée, on doit synchro si le
+        # dernier sync date d'avant l'heure de notification du jour
+        today_trigger = datetime.combine(now.date(), self.notification_hour)
+        return now >= today_trigger and last_sync < today_trigger
     
-    def _update_state(self, success: bool, error: Optional[str] = None, issues: Optional[List[PlaneIssue]] = None):
+    async def _update_state(self, success: bool, error: Optional[str] = None, issues: Optional[List[PlaneIssue]] = None):
         """Met à jour le state après une tentative de sync.
         
         Args:
@@ -114,7 +280,9 @@ class SyncService:
             error: Message d'erreur éventuel
             issues: Liste des issues synchronisées
         """
-        self.state["last_sync"] = datetime.now().isoformat()
+        self._last_sync_dt = self._now()
+        self._last_sync_iso = self._last_sync_dt.isoformat()
+        self.state["last_sync"] = self._last_sync_iso
         self.state["last_sync_status"] = "success" if success else "error"
         
         if success:
@@ -128,65 +296,74 @@ class SyncService:
                 self.state["error_count"] += 1
             self.state["last_error"] = error
             
-        self._save_state()
+        await self._save_state()
     
     async def sync(self, force: bool = False):
         """Synchronise les issues de Plane vers Teams."""
         try:
-            logging.info("Début de la synchronisation")
+            logger.info("Début de la synchronisation")
 
-            # Récupération des states
-            states = await self.plane_client.get_states()
-            logging.info("Récupération des states terminée")
+            issues = await self._fetch_issues()
+            logger.info("Récupération des states et des issues terminée")
 
             # Si pas d'états, on arrête là
-            if not states:
-                logging.info("Pas d'états à synchroniser")
+            if not self._state_map:
+                logger.info("Pas d'états à synchroniser")
                 return
-
-            # Récupération des issues
-            issues = await self.plane_client.get_issues()
-            logging.info("Récupération des issues terminée")
             
             # Formater le message
-            message = format_issues(issues, states, self.plane_client.config)
-            logging.info("Formatage du message terminé")
+            message = format_issues(issues, self._state_map, self.plane_client.config)
+            logger.info("Formatage du message terminé")
             
             # Envoyer à Teams
             await self.teams_client.send_message(message)
-            logging.info("Envoi du message Teams terminé")
+            logger.info("Envoi du message Teams terminé")
             
             # Mettre à jour le state
-            self._update_state(True, issues=issues)
+            await self._update_state(True, issues=issues)
             
-            logging.info("Synchronisation terminée avec succès")
+            logger.info("Synchronisation terminée avec succès")
             
         except Exception as e:
-            error_msg = str(e)
-            logging.error(f"Erreur lors de la synchronisation: {error_msg}")
-            self._update_state(False, error=error_msg)
-        finally:
-            # Fermer la session du client Plane
-            await self.plane_client.close()
+            # Certaines erreurs (TimeoutError) n'ont pas de message : leur type en tient lieu
+            error_msg = str(e) or type(e).__name__
+            logger.error("Erreur lors de la synchronisation: %s", error_msg)
+            await self._update_state(False, error=error_msg)
     
     def start(self):
         """Démarre le service de synchronisation."""
+        # Si on démarre après l'heure de notif et qu'on n'a pas encore sync aujourd'hui,
+        # le job quotidien est exécuté une première fois immédiatement. Le job store
+        # est en mémoire : APScheduler ne peut pas rattraper seul une exécution
+        # manquée pendant que le service était arrêté.
+        job_options = {}
+        if self._should_sync():
+            logger.info("Démarrage après l'heure de notification, tentative de sync immédiate")
+            job_options['next_run_time'] = self._now()
+        
         # Ajouter le job de sync quotidien
         self.scheduler.add_job(
             self.sync,
             CronTrigger(hour=self.notification_hour.hour, minute=0),
-            id='daily_sync'
+            id='daily_sync',
+            misfire_grace_time=24 * 3600,
+            coalesce=True,
+            max_instances=1,
+            **job_options
         )
         
-        # Si on démarre après l'heure de notif et qu'on n'a pas encore sync aujourd'hui
-        if self._should_sync():
-            logging.info("Démarrage après l'heure de notification, tentative de sync immédiate")
-            self.scheduler.add_job(self.sync, 'date')
-        
         self.scheduler.start()
-        logging.info("Service de synchronisation démarré")
+        logger.info("Service de synchronisation démarré")
     
     def stop(self):
         """Arrête le service de synchronisation."""
         self.scheduler.shutdown()
-        logging.info("Service de synchronisation arrêté") 
\ No newline at end of file
+        
+        # Dernière écriture synchrone du state en attente
+        if self._dirty:
+            try:
+                self._write_state(self._dump_state())
+                self._dirty = False
+            except Exception as e:
+                logger.error("Erreur lors de la sauvegarde du state: %s", e)
+        logger.info("Service de synchronisation arrêté") 
\ No newline at end of file
@@ -1,6 +1,7 @@
 """
 Microsoft Teams webhook client for sending messages.
 """
+import asyncio
 import json
 import logging
 from typing import Dict, Optional
@@ -12,18 +13,64 @@ from plane_to_teams.teams_formatter import TeamsMessage
 
 logger = logging.getLogger(__name__)
 
+# Le corps est déjà sérialisé par TeamsMessage.to_bytes
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 class TeamsClient:
     """Client for sending messages to Microsoft Teams via webhook."""
 
-    def __init__(self, webhook_url: str, timeout: int = 10):
+    def __init__(
+        self,
+        webhook_url: str,
+        timeout: int = 10,
+        session: Optional[aiohttp.ClientSession] = None,
+        max_concurrent: int = 4
+    ):
         """Initialize Teams client.
         
         Args:
             webhook_url: The webhook URL for the Teams channel
             timeout: Request timeout in seconds
+            session: Optional session shared with other clients. It is not
+                closed by the client, its owner is responsible for it.
+            max_concurrent: Maximum number of messages sent at the same time.
+                Further sends wait for a slot, which bounds the number of
+                pending requests on the connector.
         """
         self.webhook_url = webhook_url
         self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = session
+        self._owns_session = session is None
+        self._send_slots = asyncio.Semaphore(max_concurrent)
+
+    async def __aenter__(self) -> 'TeamsClient':
+        """Open the client session."""
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Close the client session."""
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the client session, creating it if needed.
+
+        The session keeps its connections alive so that successive messages
+        reuse the same TCP/TLS connection to the webhook.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=10, keepalive_timeout=75)
+            self._session = aiohttp.ClientSession(connector=connector)
+            # Session créée par le client (y compris à la place d'une session
+            # partagée déjà fermée) : c'est à lui de la fermer
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Close the client session, unless it is shared."""
+        if self._session and self._owns_session:
+            await self._session.close()
+            self._session = None
 
     async def send_message(self, message: TeamsMessage) -> bool:
         """Send a message to Teams.
@@ -39,14 +86,20 @@ class TeamsClient:
         """
         try:
             logger.info("Sending message to Teams")
-            logger.debug("Message content: %s", message.to_dict())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Message content: %s", message.to_dict())
             
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(self.webhook_url, json=message.to_dict()) as response:
-                    response.raise_for_status()
-                    
-                    logger.info("Successfully sent message to Teams")
-                    return True
+            session = await self._get_session()
+            async with self._send_slots, session.post(
+                self.webhook_url,
+                data=message.to_bytes(),
+                headers=_JSON_HEADERS,
+                timeout=self.timeout
+            ) as response:
+                response.raise_for_status()
+                
+                logger.info("Successfully sent message to Teams")
+                return True
             
         except ClientError as e:
             logger.error("Failed to send message to Teams: %s", str(e))
@@ -1,19 +1,69 @@
 """
 Teams message formatter for Plane issues.
 """
+import heapq
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from operator import itemgetter
+from typing import Dict, Final, FrozenSet, List, Tuple
+
+import orjson
 
 from plane_to_teams.config import Config
 from plane_to_teams.plane_client import PlaneIssue, PlaneState
 
-PRIORITY_COLORS = {
+__all__ = ["ACTIVE_STATE_GROUPS", "PRIORITY_COLORS", "TeamsMessage", "format_issues"]
+
+PRIORITY_COLORS: Final[Dict[str, str]] = {
     "urgent": "ff0000",  # Red
     "high": "ffa500",    # Orange
     "medium": "008000",  # Green
     "low": "0000ff"      # Blue
 }
 
+# Couleurs indexées par libellé affiché (priorité en majuscules)
+_PRIORITY_COLORS_BY_LABEL: Final[Dict[str, str]] = {
+    priority.upper(): color for priority, color in PRIORITY_COLORS.items()
+}
+
+# Rang de tri des priorités (les priorités inconnues passent en dernier)
+_PRIORITY_RANK: Final[Dict[str, int]] = {
+    "urgent": 0,
+    "high": 1,
+    "medium": 2,
+    "low": 3
+}
+
+# Groupes d'états affichés dans le message
+ACTIVE_STATE_GROUPS: Final[FrozenSet[str]] = frozenset({'backlog', 'unstarted', 'started'})
+
+# Partie fixe de la carte envoyée à Teams
+_CARD_HEADER: Final[Dict[str, str]] = {
+    "@type": "MessageCard",
+    "@context": "http://schema.org/extensions",
+    "themeColor": "0076D7"
+}
+
+# Morceaux constants de la carte sérialisée, dans l'ordre des clés de to_dict
+_CARD_PREFIX_BYTES: Final[bytes] = orjson.dumps(_CARD_HEADER)[:-1] + b',"summary":'
+_CARD_TITLE_BYTES: Final[bytes] = b',"title":'
+_CARD_FACTS_BYTES: Final[bytes] = b',"sections":[{"facts":'
+_CARD_SUFFIX_BYTES: Final[bytes] = b',"markdown":true}]}'
+
+
+def _make_fact(index: int, priority: str, name: str, state: str, url: str) -> Dict[str, str]:
+    """Build the fact displayed for one issue of the message."""
+    color = _PRIORITY_COLORS_BY_LABEL.get(priority)
+    if color is None:
+        color = PRIORITY_COLORS.get(priority.lower(), "000000")
+    return {
+        "name": "#" + str(index + 1),
+        "value": "".join((
+            "<span style='color:#", color, "'>[", priority, "]</span> [",
+            name, "](", url, ") - **", state, "**"
+        ))
+    }
+
+
 @dataclass
 class TeamsMessage:
     """Represents a Teams message."""
@@ -27,69 +77,67 @@ class TeamsMessage:
         Returns:
             Dict: The message in Teams format
         """
-        facts = []
-        for i, (priority, name, state, url) in enumerate(self.items):
-            color = PRIORITY_COLORS.get(priority.lower(), "000000")
-            
-            facts.append({
-                "name": f"#{i+1}",
-                "value": f"<span style='color:#{color}'>[{priority}]</span> [{name}]({url}) - **{state}**"
-            })
-
         return {
-            "@type": "MessageCard",
-            "@context": "http://schema.org/extensions",
-            "themeColor": "0076D7",
+            **_CARD_HEADER,
             "summary": self.title,
             "title": "🎯 " + self.title,
             "sections": [{
-                "facts": facts,
+                "facts": [_make_fact(i, *item) for i, item in enumerate(self.items)],
                 "markdown": True
             }]
         }
+    
+    def to_bytes(self) -> bytes:
+        """Serialize to the JSON body sent to Teams.
+        
+        Only the title and the facts are serialized, the constant parts of
+        the card are serialized once at import time.
+        
+        Returns:
+            bytes: The message in Teams format, encoded as JSON
+        """
+        facts = [_make_fact(i, *item) for i, item in enumerate(self.items)]
+        return b''.join((
+            _CARD_PREFIX_BYTES,
+            orjson.dumps(self.title),
+            _CARD_TITLE_BYTES,
+            orjson.dumps("🎯 " + self.title),
+            _CARD_FACTS_BYTES,
+            orjson.dumps(facts),
+            _CARD_SUFFIX_BYTES
+        ))
 
 
-def format_issues(issues: List[PlaneIssue], states: List[PlaneState], config: Config) -> TeamsMessage:
+def format_issues(issues: List[PlaneIssue], state_map: Dict[str, PlaneState], config: Config) -> TeamsMessage:
     """Format a list of issues into a Teams message.
     
     Args:
         issues: List of issues to format
-        states: List of states from Plane API
+        state_map: States from Plane API, indexed by state ID
         config: Application configuration
         
     Returns:
         TeamsMessage: The formatted message
     """
-    # Create a map of state IDs to state objects
-    state_map = {state.id: state for state in states}
-    
     # Filter issues by state group (only keep backlog, unstarted, started)
-    filtered_issues = [
-        issue for issue in issues 
-        if state_map[issue.state].group in ['backlog', 'unstarted', 'started']
-    ]
-    
-    # Sort by priority first, then by state sequence
-    filtered_issues.sort(key=lambda x: (
-        {
-            "urgent": 0,
-            "high": 1,
-            "medium": 2,
-            "low": 3
-        }.get(x.priority, 4),
-        state_map[x.state].sequence
-    ))
+    # and compute their sort key once: priority first, then state sequence
+    keyed_issues: List[Tuple[Tuple[int, int], PlaneIssue]] = []
+    for issue in issues:
+        state = state_map[issue.state]
+        if state.group in ACTIVE_STATE_GROUPS:
+            keyed_issues.append(((_PRIORITY_RANK.get(issue.priority, 4), state.sequence), issue))
     
-    # Take top 10 issues
-    top_issues = filtered_issues[:10]
+    # Take top 10 issues without sorting the whole list
+    top_issues = [issue for _, issue in heapq.nsmallest(10, keyed_issues, key=itemgetter(0))]
     
     # Format issues into message items with priority colors and URLs
-    items = [
+    url_prefix = f"https://plane.julienfroidefond.com/{config.plane_workspace}/projects/{config.plane_project_id}/issues/"
+    items: List[Tuple[str, str, str, str]] = [
         (
             issue.priority.upper(),
             issue.name,
             state_map[issue.state].name,
-            f"https://plane.julienfroidefond.com/{config.plane_workspace}/projects/{config.plane_project_id}/issues/{issue.id}"
+            url_prefix + issue.id
         )
         for issue in top_issues
     ]
@@ -20,6 +20,7 @@ class TestConfig(TestCase):
             'LOG_LEVEL': 'DEBUG',
             'LOG_FILE': 'test.log'
         }
+        Config.from_env.cache_clear()
 
     def test_config_from_env(self):
         """Test configuration loading from environment variables."""
@@ -35,6 +36,15 @@ class TestConfig(TestCase):
             self.assertEqual(config.log_level, 'DEBUG')
             self.assertEqual(config.log_file, 'test.log')
 
+    def test_config_from_env_cached(self):
+        """Test that configuration is only built once per process."""
+        with mock.patch.dict(os.environ, self.env_vars):
+            config = Config.from_env()
+            self.assertIs(Config.from_env(), config)
+
+            Config.from_env.cache_clear()
+            self.assertIsNot(Config.from_env(), config)
+
     def test_config_validation_success(self):
         """Test configuration validation with valid data."""
         with mock.patch.dict(os.environ, self.env_vars):
@@ -57,6 +67,7 @@ class TestConfig(TestCase):
             env_vars[field] = ''
             
             with mock.patch.dict(os.environ, env_vars):
+                Config.from_env.cache_clear()
                 config = Config.from_env()
                 error = config.validate()
                 self.assertIsNotNone(error)
@@ -70,4 +81,25 @@ class TestConfig(TestCase):
         with mock.patch.dict(os.environ, env_vars):
             config = Config.from_env()
             error = config.validate()
-            self.assertEqual(error, "Sync Interval must be greater than 0") 
+            self.assertEqual(error, "Sync Interval must be greater than 0")
+
+    def test_config_invalid_integer(self):
+        """Test that a non numeric integer is reported by validation."""
+        env_vars = self.env_vars.copy()
+        env_vars['SYNC_INTERVAL'] = 'abc'
+
+        with mock.patch.dict(os.environ, env_vars):
+            config = Config.from_env()
+            error = config.validate()
+            self.assertEqual(error, "Sync Interval must be an integer")
+
+    def test_config_validation_invalid_notification_hour(self):
+        """Test configuration validation with an out of range notification hour."""
+        for hour in ('-1', '24'):
+            env_vars = self.env_vars.copy()
+            env_vars['NOTIFICATION_HOUR'] = hour
+
+            with mock.patch.dict(os.environ, env_vars):
+                Config.from_env.cache_clear()
+                error = Config.from_env().validate()
+                self.assertEqual(error, "Notification Hour must be between 0 and 23")
@@ -1,18 +1,28 @@
 """Tests for the logger module."""
+import gzip
+import json
+import logging
 import os
+import stat
+import tempfile
 import unittest
+from dataclasses import replace
+from logging.handlers import QueueHandler
 from unittest import mock
 
 from plane_to_teams.config import Config
-from plane_to_teams.logger import setup_logging
+from plane_to_teams.logger import _gzip_namer, _gzip_rotator, setup_logging, shutdown_logging
 
 
 class TestLogger(unittest.TestCase):
     """Test cases for logger module."""
 
-    def setUp(self):
-        """Set up test cases."""
-        self.config = Config(
+    @classmethod
+    def setUpClass(cls):
+        """Set up the configuration shared by the test cases."""
+        # Les fichiers de log sont écrits dans un dossier temporaire supprimé après les tests
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.config = Config(
             plane_api_token='test_token',
             plane_base_url='http://test.url',
             plane_workspace='test_workspace',
@@ -22,26 +32,87 @@ class TestLogger(unittest.TestCase):
             max_retries=3,
             sync_interval=10,
             log_level='DEBUG',
-            log_file='test.log'
+            log_file=os.path.join(cls.tmp_dir.name, 'test.log')
         )
 
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the temporary log directory."""
+        cls.tmp_dir.cleanup()
+
+    def setUp(self):
+        """Start each test without a log file."""
+        self.addCleanup(self._remove_log_file)
+        self.addCleanup(shutdown_logging)
+
+    def _remove_log_file(self):
+        """Remove the log file written by the test."""
+        try:
+            os.remove(self.config.log_file)
+        except FileNotFoundError:
+            pass
+
     def test_setup_logging(self):
         """Test logging setup."""
         logger = setup_logging(self.config)
         self.assertIsNotNone(logger)
         self.assertEqual(logger.level, 10)  # DEBUG level
-        self.assertEqual(len(logger.handlers), 2)  # File and console handlers
-        os.remove(self.config.log_file)
+        self.assertEqual(len(logger.handlers), 1)  # Queue handler
+        self.assertIsInstance(logger.handlers[0], QueueHandler)
 
     def test_setup_logging_file_creation(self):
         """Test log file creation."""
         setup_logging(self.config)
-        self.assertTrue(os.path.exists(self.config.log_file))
-        os.remove(self.config.log_file)
+        self.assertTrue(stat.S_ISREG(os.stat(self.config.log_file).st_mode))
+
+    def test_setup_logging_writes_through_queue(self):
+        """Test that queued records reach the log file."""
+        setup_logging(self.config)
+        logging.getLogger("test").warning("queued message")
+        shutdown_logging()
+
+        with open(self.config.log_file) as f:
+            messages = [json.loads(line)["message"] for line in f]
+        self.assertIn("queued message", messages)
+
+    def test_shutdown_logging_removes_queue_handler(self):
+        """Test that no record is queued once logging is shut down."""
+        logger = setup_logging(self.config)
+        shutdown_logging()
+        self.assertFalse(any(isinstance(h, QueueHandler) for h in logger.handlers))
+
+    def test_setup_logging_keeps_exc_info(self):
+        """Test that tracebacks are written in their own JSON field."""
+        setup_logging(self.config)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("test").error("Traceback:", exc_info=True)
+        shutdown_logging()
+
+        with open(self.config.log_file) as f:
+            records = [json.loads(line) for line in f]
+        record = next(r for r in records if r["message"] == "Traceback:")
+        self.assertIn("ValueError: boom", record["exc_info"])
 
     def test_setup_logging_invalid_level(self):
         """Test logging setup with invalid log level."""
-        self.config.log_level = 'INVALID'
+        config = replace(self.config, log_level='INVALID')
         with self.assertRaises(ValueError) as cm:
-            setup_logging(self.config)
-        self.assertEqual(str(cm.exception), "Invalid log level: INVALID") 
\ No newline at end of file
+            setup_logging(config)
+        self.assertEqual(str(cm.exception), "Invalid log level: INVALID")
+
+    def test_gzip_rotation(self):
+        """Test that rotated log files are compressed."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = os.path.join(tmp_dir, "app.log")
+            with open(source, "w") as f:
+                f.write("rotated content")
+
+            dest = _gzip_namer(source + ".1")
+            _gzip_rotator(source, dest)
+
+            self.assertEqual(dest, source + ".1.gz")
+            self.assertFalse(os.path.exists(source))
+            with gzip.open(dest, "rt") as f:
+                self.assertEqual(f.read(), "rotated content")
@@ -1,16 +1,24 @@
 """Tests for the Plane API client."""
+import asyncio
 import json
-from datetime import datetime
 from unittest.mock import AsyncMock, patch
 
+import aiohttp
 import pytest
-from aiohttp import ClientError
+import pytest_asyncio
+from aiohttp import ClientError, ClientResponseError
+from aioresponses import aioresponses
 
 from plane_to_teams.config import Config
 from plane_to_teams.plane_client import PlaneClient, PlaneIssue, PlaneState
 
+PROJECT_URL = "https://test.plane.so/api/v1/workspaces/test_workspace/projects/test_project"
+STATES_URL = f"{PROJECT_URL}/states/"
+ISSUES_URL = f"{PROJECT_URL}/issues/"
+CREATED_AT = "2024-01-29T08:00:00"
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def config():
     """Create a test configuration."""
     return Config(
@@ -22,13 +30,20 @@ def config():
     )
 
 
-@pytest.fixture
-def client(config):
-    """Create a test client."""
-    return PlaneClient(config)
+@pytest_asyncio.fixture(scope="module")
+async def http_session():
+    """Create the HTTP session shared by the tests of the module."""
+    async with aiohttp.ClientSession() as session:
+        yield session
 
 
 @pytest.fixture
+def client(config, http_session):
+    """Create a test client on the shared HTTP session."""
+    return PlaneClient(config, session=http_session)
+
+
+@pytest.fixture(scope="session")
 def sample_issue_data():
     """Create sample issue data."""
     return {
@@ -37,8 +52,8 @@ def sample_issue_data():
         "description_html": "<p>Test</p>",
         "priority": "urgent",
         "state": "state1",
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat(),
+        "created_at": CREATED_AT,
+        "updated_at": CREATED_AT,
         "estimate_point": None,
         "start_date": None,
         "target_date": None,
@@ -50,7 +65,29 @@ def sample_issue_data():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def expected_issue():
+    """Create the issue expected from the sample issue data."""
+    return PlaneIssue(
+        id="test_id",
+        name="Test Issue",
+        description_html="<p>Test</p>",
+        priority="urgent",
+        state="state1",
+        created_at=CREATED_AT,
+        updated_at=CREATED_AT,
+        estimate_point=None,
+        start_date=None,
+        target_date=None,
+        completed_at=None,
+        sequence_id=1,
+        project_id="test_project",
+        labels=[],
+        assignees=[]
+    )
+
+
+@pytest.fixture(scope="session")
 def sample_state_data():
     """Create sample state data."""
     return {
@@ -63,15 +100,46 @@ def sample_state_data():
     }
 
 
-@pytest.mark.asyncio
+def test_urls(client):
+    """Test that endpoint URLs are built from the configuration."""
+    assert client._issues_url == ISSUES_URL
+    assert client._states_url == STATES_URL
+
+
+def test_issue_from_api_response_interns_repeated_values(sample_issue_data):
+    """Test that repeated values are shared between issues."""
+    data = dict(sample_issue_data, labels=["label1"], assignees=["user1"])
+    other = {key: (value.encode().decode() if isinstance(value, str) else value)
+             for key, value in data.items()}
+    other["labels"] = ["".join(["label", "1"])]
+    other["assignees"] = ["".join(["user", "1"])]
+
+    first = PlaneIssue.from_api_response(data)
+    second = PlaneIssue.from_api_response(other)
+
+    assert first.state is second.state
+    assert first.priority is second.priority
+    assert first.project_id is second.project_id
+    assert first.labels[0] is second.labels[0]
+    assert first.assignees[0] is second.assignees[0]
+
+
+def test_issue_from_api_response_keeps_non_string_values(sample_issue_data):
+    """Test that values which are not strings are kept as is."""
+    label = {"id": "label1", "name": "Bug"}
+    data = dict(sample_issue_data, priority=None, labels=[label])
+
+    issue = PlaneIssue.from_api_response(data)
+
+    assert issue.priority is None
+    assert issue.labels == [label]
+
+
+@pytest.mark.asyncio(scope="module")
 async def test_get_states_success(client, sample_state_data):
     """Test successful states retrieval."""
-    mock_response = AsyncMock()
-    mock_response.status = 200
-    mock_response.json = AsyncMock(return_value={"results": [sample_state_data]})
-
-    with patch("aiohttp.ClientSession.get") as mock_get:
-        mock_get.return_value.__aenter__.return_value = mock_response
+    with aioresponses() as mocked:
+        mocked.get(STATES_URL, payload={"results": [sample_state_data]})
         states = await client.get_states()
 
         assert len(states) == 1
@@ -85,121 +153,142 @@ async def test_get_states_success(client, sample_state_data):
         assert state.default == sample_state_data["default"]
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="module")
 async def test_get_states_failure(client):
     """Test states retrieval failure."""
-    mock_response = AsyncMock()
-    mock_response.status = 500
-    mock_response.text = AsyncMock(return_value="Internal Server Error")
-    mock_response.json = AsyncMock(side_effect=ClientError())
-
-    with patch("aiohttp.ClientSession.get") as mock_get:
-        mock_get.return_value.__aenter__.return_value = mock_response
+    with aioresponses() as mocked:
+        mocked.get(STATES_URL, status=500, body="Internal Server Error")
         with pytest.raises(ClientError):
             await client.get_states()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="module")
 async def test_get_states_not_found(client):
     """Test states not found."""
-    mock_response = AsyncMock()
-    mock_response.status = 404
-    mock_response.text = AsyncMock(return_value="Not Found")
-    mock_response.json = AsyncMock(side_effect=ClientError())
-
-    with patch("aiohttp.ClientSession.get") as mock_get:
-        mock_get.return_value.__aenter__.return_value = mock_response
+    with aioresponses() as mocked:
+        mocked.get(STATES_URL, status=404, body="Not Found")
         with pytest.raises(ClientError):
             await client.get_states()
 
 
-@pytest.mark.asyncio
-async def test_get_issues_success(client, sample_issue_data):
+@pytest.mark.asyncio(scope="module")
+async def test_get_issues_success(client, sample_issue_data, expected_issue):
     """Test successful issues retrieval."""
-    mock_response = AsyncMock()
-    mock_response.status = 200
-    mock_response.json = AsyncMock(return_value={"results": [sample_issue_data]})
-
-    with patch("aiohttp.ClientSession.get") as mock_get:
-        mock_get.return_value.__aenter__.return_value = mock_response
+    with aioresponses() as mocked:
+        mocked.get(ISSUES_URL, payload={"results": [sample_issue_data]})
         issues = await client.get_issues()
 
-        assert len(issues) == 1
-        issue = issues[0]
-        assert isinstance(issue, PlaneIssue)
-        assert issue.id == sample_issue_data["id"]
-        assert issue.name == sample_issue_data["name"]
-        assert issue.priority == sample_issue_data["priority"]
-        assert issue.state == sample_issue_data["state"]
+        assert issues == [expected_issue]
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="module")
 async def test_get_issues_failure(client):
     """Test issues retrieval failure."""
-    mock_response = AsyncMock()
-    mock_response.status = 500
-    mock_response.text = AsyncMock(return_value="Internal Server Error")
-    mock_response.json = AsyncMock(side_effect=ClientError())
-
-    with patch("aiohttp.ClientSession.get") as mock_get:
-        mock_get.return_value.__aenter__.return_value = mock_response
-        with pytest.raises(ClientError):
+    with aioresponses() as mocked:
+        mocked.get(ISSUES_URL, status=500, body="Internal Server Error")
+        with pytest.raises(ClientResponseError) as exc_info:
             await client.get_issues()
 
+    assert exc_info.value.status == 500
+
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="module")
 async def test_get_issues_not_found(client):
     """Test issues not found."""
-    mock_response = AsyncMock()
-    mock_response.status = 404
-    mock_response.text = AsyncMock(return_value="Not Found")
-    mock_response.json = AsyncMock(side_effect=ClientError())
-
-    with patch("aiohttp.ClientSession.get") as mock_get:
-        mock_get.return_value.__aenter__.return_value = mock_response
+    with aioresponses() as mocked:
+        mocked.get(ISSUES_URL, status=404, body="Not Found")
         with pytest.raises(ClientError):
             await client.get_issues()
 
 
-@pytest.mark.asyncio
-async def test_get_issue_success(client, sample_issue_data):
+@pytest.mark.asyncio(scope="module")
+async def test_get_issue_success(client, sample_issue_data, expected_issue):
     """Test successful issue retrieval."""
-    mock_response = AsyncMock()
-    mock_response.status = 200
-    mock_response.json = AsyncMock(return_value=sample_issue_data)
-
-    with patch("aiohttp.ClientSession.get") as mock_get:
-        mock_get.return_value.__aenter__.return_value = mock_response
+    with aioresponses() as mocked:
+        mocked.get(f"{ISSUES_URL}test_id/", payload=sample_issue_data)
         issue = await client.get_issue("test_id")
 
-        assert isinstance(issue, PlaneIssue)
-        assert issue.id == sample_issue_data["id"]
-        assert issue.name == sample_issue_data["name"]
-        assert issue.priority == sample_issue_data["priority"]
-        assert issue.state == sample_issue_data["state"]
+        assert issue == expected_issue
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_fetch_all(client):
+    """Test concurrent retrieval of states and issues."""
+    states = [object()]
+    issues = [object(), object()]
+
+    with patch.object(client, "get_states", AsyncMock(return_value=states)), \
+         patch.object(client, "get_issues", AsyncMock(return_value=issues)):
+        assert await client.fetch_all() == (states, issues)
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_fetch_all_failure(client):
+    """Test that a failed request cancels the other one and is re-raised."""
+    cancelled = asyncio.Event()
+
+    async def slow_issues():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with patch.object(client, "get_states", AsyncMock(side_effect=ValueError("Invalid API response format"))), \
+         patch.object(client, "get_issues", slow_issues):
+        with pytest.raises(ValueError, match="Invalid API response format"):
+            await client.fetch_all()
+    assert cancelled.is_set()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="module")
 async def test_get_states_invalid_response(client):
     """Test states retrieval with invalid response format."""
-    mock_response = AsyncMock()
-    mock_response.status = 200
-    mock_response.json = AsyncMock(return_value={"invalid": "format"})
-
-    with patch("aiohttp.ClientSession.get") as mock_get:
-        mock_get.return_value.__aenter__.return_value = mock_response
+    with aioresponses() as mocked:
+        mocked.get(STATES_URL, payload={"invalid": "format"})
         with pytest.raises(ValueError, match="Invalid API response format"):
             await client.get_states()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="module")
 async def test_get_states_invalid_state_data(client):
     """Test states retrieval with invalid state data."""
-    mock_response = AsyncMock()
-    mock_response.status = 200
-    mock_response.json = AsyncMock(return_value={"results": [{"invalid": "state"}]})
-
-    with patch("aiohttp.ClientSession.get") as mock_get:
-        mock_get.return_value.__aenter__.return_value = mock_response
+    with aioresponses() as mocked:
+        mocked.get(STATES_URL, payload={"results": [{"invalid": "state"}]})
         states = await client.get_states()
-        assert len(states) == 0  # Le state invalide est ignoré
\ No newline at end of file
+        assert len(states) == 0  # Le state invalide est ignoré
+
+@pytest.mark.asyncio(scope="module")
+async def test_client_context_manager_reuses_session(config):
+    """Test that the client keeps one session open and closes it on exit."""
+    async with PlaneClient(config) as client:
+        session = await client._ensure_session()
+        assert await client._ensure_session() is session
+        assert not session.closed
+
+    assert session.closed
+    assert client.session is None
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_client_does_not_close_shared_session(config):
+    """Test that a session injected by the caller is left open."""
+    async with aiohttp.ClientSession() as session:
+        async with PlaneClient(config, session=session) as client:
+            assert await client._ensure_session() is session
+
+        assert not session.closed
+
+
+@pytest.mark.asyncio(scope="module")
+async def test_client_closes_session_replacing_closed_shared_one(config):
+    """Test that a session created in place of a closed shared one is closed."""
+    shared = aiohttp.ClientSession()
+    await shared.close()
+
+    client = PlaneClient(config, session=shared)
+    session = await client._ensure_session()
+    assert session is not shared
+
+    await client.close()
+    assert session.closed
@@ -1,57 +1,152 @@
 """Tests for the sync service."""
-import json
-from datetime import datetime, time, timedelta
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch
-import os
 
+import orjson
 import pytest
-from freezegun import freeze_time
 from aiohttp import ClientError
 
+from plane_to_teams.config import Config
 from plane_to_teams.plane_client import PlaneIssue, PlaneState
-from plane_to_teams.sync_service import SyncService
+from plane_to_teams.sync_service import STATE_CACHE_TTL, SyncService
+
+# Configuration utilisée pour construire les URLs des issues
+TEST_CONFIG = Config(
+    plane_api_token="test_token",
+    plane_base_url="https://test.plane.so/api/v1",
+    plane_workspace="test_workspace",
+    plane_project_id="test_project",
+    teams_webhook_url="https://test.teams.webhook"
+)
+
+# Date de création des issues de test
+CREATED_AT = "2024-01-29T08:00:00"
+
+# Issue renvoyée par le client de test pour une synchronisation réussie
+SAMPLE_ISSUE = PlaneIssue(
+    id="1",
+    name="Test Issue",
+    description_html="<p>Test</p>",
+    priority="urgent",
+    state="state1",  # En cours
+    created_at=CREATED_AT,
+    updated_at=CREATED_AT,
+    estimate_point=None,
+    start_date=None,
+    target_date=None,
+    completed_at=None,
+    sequence_id=1,
+    project_id="test",
+    labels=[],
+    assignees=[]
+)
+
+# Etats Plane renvoyés par le client de test, construits une seule fois
+SAMPLE_STATES = (
+    PlaneState(
+        id="state1",
+        name="En cours",
+        color="#ff0000",
+        sequence=1,
+        group="started",
+        default=False
+    ),
+    PlaneState(
+        id="state2",
+        name="A faire",
+        color="#00ff00",
+        sequence=2,
+        group="unstarted",
+        default=False
+    ),
+    PlaneState(
+        id="state3",
+        name="Backlog",
+        color="#0000ff",
+        sequence=3,
+        group="backlog",
+        default=False
+    )
+)
+
+class StubPlaneClient:
+    """Client Plane de test, qui renvoie les données fixées par le test."""
+
+    def __init__(self):
+        self.config = TEST_CONFIG
+        self.issues = []
+        self.states = list(SAMPLE_STATES)
+        self.error = None
+        self.get_issues_count = 0
+        self.get_states_count = 0
+        self.close_count = 0
+
+    async def get_issues(self):
+        self.get_issues_count += 1
+        if self.error is not None:
+            raise self.error
+        return self.issues
+
+    async def get_states(self):
+        self.get_states_count += 1
+        return self.states
+
+    async def fetch_all(self):
+        return await self.get_states(), await self.get_issues()
+
+    async def close(self):
+        self.close_count += 1
+
+class StubTeamsClient:
+    """Client Teams de test, qui garde les messages envoyés."""
+
+    def __init__(self):
+        self.messages = []
+        self.close_count = 0
+
+    async def send_message(self, message):
+        self.messages.append(message)
+        return True
+
+    async def close(self):
+        self.close_count += 1
+
+class FakeScheduler:
+    """Scheduler de test, qui garde les jobs ajoutés sans les exécuter."""
+
+    def __init__(self):
+        self.jobs = []
+        self.running = False
+
+    def add_job(self, *args, **kwargs):
+        self.jobs.append((args, kwargs))
+
+    def start(self):
+        self.running = True
+
+    def shutdown(self):
+        self.running = False
+
+def _counts(plane_client, teams_client):
+    """Relève les appels aux clients : (states, issues, messages, fermetures)."""
+    return (
+        plane_client.get_states_count,
+        plane_client.get_issues_count,
+        len(teams_client.messages),
+        plane_client.close_count + teams_client.close_count
+    )
 
 @pytest.fixture
-def mock_plane_client():
-    """Mock du client Plane."""
-    client = AsyncMock()
-    client.get_issues = AsyncMock(return_value=[])
-    client.get_states = AsyncMock(return_value=[
-        PlaneState(
-            id="state1",
-            name="En cours",
-            color="#ff0000",
-            sequence=1,
-            group="started",
-            default=False
-        ),
-        PlaneState(
-            id="state2",
-            name="A faire",
-            color="#00ff00",
-            sequence=2,
-            group="unstarted",
-            default=False
-        ),
-        PlaneState(
-            id="state3",
-            name="Backlog",
-            color="#0000ff",
-            sequence=3,
-            group="backlog",
-            default=False
-        )
-    ])
-    client.close = AsyncMock()
-    return client
+def plane_client():
+    """Client Plane de test."""
+    return StubPlaneClient()
 
 @pytest.fixture
-def mock_teams_client():
-    """Mock du client Teams."""
-    client = AsyncMock()
-    client.send_message = AsyncMock()
-    return client
+def teams_client():
+    """Client Teams de test."""
+    return StubTeamsClient()
 
 @pytest.fixture
 def temp_state_file(tmp_path):
@@ -59,21 +154,28 @@ def temp_state_file(tmp_path):
     return tmp_path / ".state.json"
 
 @pytest.fixture
-def sync_service(mock_plane_client, mock_teams_client, temp_state_file):
+def memory_state(monkeypatch):
+    """Remplace le fichier de state par un stockage en mémoire."""
+    storage = {}
+    monkeypatch.setattr(SyncService, "_read_state", lambda self: storage.get("data"))
+    monkeypatch.setattr(SyncService, "_write_state", lambda self, data: storage.update(data=data))
+    return storage
+
+@pytest.fixture
+def sync_service(plane_client, teams_client, temp_state_file):
     """Crée une instance du service de sync pour les tests."""
     return SyncService(
-        plane_client=mock_plane_client,
-        teams_client=mock_teams_client,
+        plane_client=plane_client,
+        teams_client=teams_client,
+        state_file=temp_state_file,
         notification_hour=8,
-        max_retries=3
+        max_retries=3,
+        scheduler=FakeScheduler()
     )
 
+@pytest.mark.usefixtures("memory_state")
 def test_load_state_new_file(sync_service):
-    """Test du chargement du state avec un nouveau fichier."""
-    # On s'assure que le fichier n'existe pas
-    if os.path.exists(sync_service.state_file):
-        os.remove(sync_service.state_file)
-    
+    """Test du chargement du state sans state existant."""
     state = sync_service._load_state()
     assert state["last_sync"] is None
     assert state["last_sync_status"] == "success"
@@ -81,8 +183,12 @@ def test_load_state_new_file(sync_service):
     assert state["error_count"] == 0
     assert state["last_error"] is None
 
-def test_load_state_existing_file(sync_service, temp_state_file):
-    """Test du chargement du state depuis un fichier existant."""
+def test_read_state_missing_file(sync_service):
+    """Test de la lecture du state quand le fichier n'existe pas."""
+    assert sync_service._read_state() is None
+
+def test_load_state_existing_file(sync_service, memory_state):
+    """Test du chargement d'un state existant."""
     test_state = {
         "last_sync": "2024-01-29T08:00:00+01:00",
         "last_sync_status": "success",
@@ -90,18 +196,12 @@ def test_load_state_existing_file(sync_service, temp_state_file):
         "error_count": 0,
         "last_error": None
     }
+    memory_state["data"] = orjson.dumps(test_state)
 
-    # On s'assure que le répertoire existe
-    os.makedirs(os.path.dirname(temp_state_file), exist_ok=True)
-    
-    with open(temp_state_file, 'w') as f:
-        json.dump(test_state, f)
-
-    sync_service.state_file = temp_state_file
     state = sync_service._load_state()
     assert state == test_state
 
-def test_save_state(sync_service, temp_state_file):
+async def test_save_state(sync_service, memory_state):
     """Test de la sauvegarde du state."""
     test_state = {
         "last_sync": "2024-01-29T08:00:00+01:00",
@@ -111,141 +211,200 @@ def test_save_state(sync_service, temp_state_file):
         "last_error": None
     }
     sync_service.state = test_state
-    sync_service.state_file = temp_state_file
-
-    # On s'assure que le répertoire existe
-    os.makedirs(os.path.dirname(temp_state_file), exist_ok=True)
     
-    sync_service._save_state()
+    await sync_service._save_state()
 
-    with open(temp_state_file) as f:
-        saved_state = json.load(f)
-    assert saved_state == test_state
+    assert orjson.loads(memory_state["data"]) == test_state
 
 @pytest.mark.parametrize("current_time,last_sync,expected", [
     # Pas de dernier sync -> doit sync
-    ("2024-01-29 08:00:00", None, True),
+    (datetime(2024, 1, 29, 8), None, True),
     
     # Dernier sync aujourd'hui avant 8h, maintenant 8h -> doit sync
-    ("2024-01-29 08:00:00", "2024-01-29T07:00:00", True),
+    (datetime(2024, 1, 29, 8), "2024-01-29T07:00:00", True),
     
     # Dernier sync aujourd'hui après 8h -> ne doit pas sync
-    ("2024-01-29 09:00:00", "2024-01-29T08:00:00", False),
+    (datetime(2024, 1, 29, 9), "2024-01-29T08:00:00", False),
     
     # Dernier sync hier avant 8h, maintenant avant 8h -> ne doit pas sync
-    ("2024-01-29 07:00:00", "2024-01-28T07:00:00", False),
+    (datetime(2024, 1, 29, 7), "2024-01-28T07:00:00", False),
     
     # Dernier sync hier avant 8h, maintenant après 8h -> doit sync
-    ("2024-01-29 08:00:00", "2024-01-28T07:00:00", True),
+    (datetime(2024, 1, 29, 8), "2024-01-28T07:00:00", True),
 ])
-def test_should_sync(sync_service, current_time, last_sync, expected):
+def test_should_sync(sync_service, monkeypatch, current_time, last_sync, expected):
     """Test de la logique de décision de synchronisation."""
     sync_service.state["last_sync"] = last_sync
     
-    with freeze_time(current_time):
-        assert sync_service._should_sync() == expected
-
-@pytest.mark.asyncio
-async def test_sync_success(sync_service, mock_plane_client, mock_teams_client):
-    """Test d'une synchronisation réussie."""
-    # Setup mock issues
-    mock_plane_client.get_issues.return_value = [
-        PlaneIssue(
-            id="1",
-            name="Test Issue",
-            description_html="<p>Test</p>",
-            priority="urgent",
-            state="state1",  # En cours
-            created_at=datetime.now().isoformat(),
-            updated_at=datetime.now().isoformat(),
-            estimate_point=None,
-            start_date=None,
-            target_date=None,
-            completed_at=None,
-            sequence_id=1,
-            project_id="test",
-            labels=[],
-            assignees=[]
-        )
-    ]
+    monkeypatch.setattr(sync_service, "_now", lambda: current_time)
+    assert sync_service._should_sync() == expected
+
+async def test_last_sync_cached(sync_service, temp_state_file):
+    """Test que la date de dernière sync n'est pas reconvertie à chaque appel."""
+    sync_service.state_file = temp_state_file
+    await sync_service._update_state(True)
+    
+    last_sync = sync_service._last_sync()
+    assert last_sync.isoformat() == sync_service.state["last_sync"]
+    assert sync_service._last_sync() is last_sync
+
+@pytest.mark.parametrize("issues,states,error,expect_send", [
+    # Synchronisation réussie
+    ([SAMPLE_ISSUE], SAMPLE_STATES, None, True),
+    
+    # Erreur client
+    ([], SAMPLE_STATES, ClientError(), False),
+    
+    # Erreur de valeur
+    ([], SAMPLE_STATES, ValueError("Invalid data"), False),
+    
+    # Pas d'états -> on s'arrête sans envoyer de message
+    ([], (), None, False),
+    
+    # Pas d'issues -> on envoie quand même un message
+    ([], SAMPLE_STATES, None, True),
+], ids=["success", "client_error", "value_error", "empty_states", "empty_issues"])
+async def test_sync(sync_service, plane_client, teams_client, issues, states, error, expect_send):
+    """Test d'une synchronisation forcée."""
+    plane_client.issues = issues
+    plane_client.error = error
+    plane_client.states = list(states)
     
     # Force sync
     await sync_service.sync(force=True)
     
-    # Verify
-    assert mock_plane_client.get_states.called
-    assert mock_plane_client.get_issues.called
-    assert mock_teams_client.send_message.called
-    assert mock_plane_client.close.called
+    # Verify : states et issues sont récupérés en parallèle
+    assert _counts(plane_client, teams_client) == (1, 1, 1 if expect_send else 0, 0)
 
-@pytest.mark.asyncio
-async def test_sync_failure_client_error(sync_service, mock_plane_client, mock_teams_client):
-    """Test d'une synchronisation échouée à cause d'une erreur client."""
-    # Setup mock to raise ClientError
-    mock_plane_client.get_issues.side_effect = ClientError()
-    
-    # Force sync
+async def test_sync_reuses_cached_states(sync_service, plane_client, teams_client):
+    """Test que les états ne sont redemandés qu'à l'expiration du cache."""
     await sync_service.sync(force=True)
+    await sync_service.sync(force=True)
+    
+    assert _counts(plane_client, teams_client) == (1, 2, 2, 0)
     
-    # Verify
-    assert mock_plane_client.get_states.called
-    assert mock_plane_client.get_issues.called
-    assert not mock_teams_client.send_message.called
-    assert mock_plane_client.close.called
+    # Cache expiré : les états sont redemandés
+    sync_service._state_map_fetched_at -= STATE_CACHE_TTL + 1
+    await sync_service.sync(force=True)
+    assert _counts(plane_client, teams_client) == (2, 3, 3, 0)
 
-@pytest.mark.asyncio
-async def test_sync_failure_value_error(sync_service, mock_plane_client, mock_teams_client):
-    """Test d'une synchronisation échouée à cause d'une erreur de valeur."""
-    # Setup mock to raise ValueError
-    mock_plane_client.get_issues.side_effect = ValueError("Invalid data")
+async def test_sync_refreshes_states_on_unknown_state(sync_service, plane_client):
+    """Test que les états sont redemandés si une issue a un état inconnu."""
+    await sync_service.sync(force=True)
     
-    # Force sync
+    plane_client.issues = [replace(SAMPLE_ISSUE, priority="high", state="state_new")]
+    plane_client.states = [
+        PlaneState(id="state_new", name="Nouveau", color="#ffffff", sequence=4, group="started", default=False)
+    ]
     await sync_service.sync(force=True)
     
-    # Verify
-    assert mock_plane_client.get_states.called
-    assert mock_plane_client.get_issues.called
-    assert not mock_teams_client.send_message.called
-    assert mock_plane_client.close.called
-
-@pytest.mark.asyncio
-async def test_sync_with_empty_states(sync_service, mock_plane_client, mock_teams_client):
-    """Test d'une synchronisation avec une liste d'états vide."""
-    # Setup mock to return empty states
-    mock_plane_client.get_states.return_value = []
+    assert plane_client.get_states_count == 2
+    assert "state_new" in sync_service._state_map
 
-    # Force sync
+async def test_sync_timeout_with_cached_states(sync_service, plane_client, teams_client, monkeypatch):
+    """Test que le délai de récupération s'applique aussi avec les états en cache."""
     await sync_service.sync(force=True)
-
-    # Verify
-    mock_plane_client.get_states.assert_called_once()
-    mock_plane_client.get_issues.assert_not_called()
-    mock_teams_client.send_message.assert_not_called()
-    mock_plane_client.close.assert_called_once()
-
-@pytest.mark.asyncio
-async def test_sync_with_empty_issues(sync_service, mock_plane_client, mock_teams_client):
-    """Test d'une synchronisation avec une liste d'issues vide."""
-    # Setup mock to return empty issues
-    mock_plane_client.get_issues.return_value = []
     
-    # Force sync
+    async def stalled_get_issues():
+        await asyncio.sleep(10)
+    
+    monkeypatch.setattr("plane_to_teams.sync_service.FETCH_TIMEOUT", 0.01)
+    monkeypatch.setattr(plane_client, "get_issues", stalled_get_issues)
     await sync_service.sync(force=True)
     
-    # Verify
-    assert mock_plane_client.get_states.called
-    assert mock_plane_client.get_issues.called
-    assert mock_teams_client.send_message.called  # Devrait quand même envoyer un message
-    assert mock_plane_client.close.called
+    assert sync_service.state["last_sync_status"] == "error"
+    assert sync_service.state["last_error"] == "TimeoutError"
+    assert len(teams_client.messages) == 1
 
-def test_start_scheduler(sync_service):
+async def test_sync_error_count_capped(sync_service, plane_client, temp_state_file, caplog):
+    """Test que le compteur d'erreurs ne dépasse pas max_retries."""
+    sync_service.state_file = temp_state_file
+    plane_client.error = ClientError()
+    
+    await asyncio.gather(*(sync_service.sync() for _ in range(sync_service.max_retries + 1)))
+    await sync_service._flush_state()
+    
+    assert plane_client.get_issues_count == sync_service.max_retries + 1
+    assert sync_service.state["last_sync_status"] == "error"
+    assert sync_service.state["error_count"] == sync_service.max_retries
+    
+    # Le state écrit sur disque est le dernier, sans erreur de sauvegarde
+    assert orjson.loads(temp_state_file.read_bytes())["error_count"] == sync_service.max_retries
+    assert "Erreur lors de la sauvegarde du state" not in caplog.text
+
+@pytest.mark.parametrize("last_sync,expect_immediate", [
+    # Jamais synchronisé, démarrage après 8h -> sync immédiate
+    (None, True),
+    
+    # Déjà synchronisé après 8h aujourd'hui -> on attend le prochain déclenchement
+    ("2024-01-29T08:00:00", False),
+], ids=["never_synced", "synced_today"])
+def test_start_scheduler(sync_service, monkeypatch, last_sync, expect_immediate):
     """Test du démarrage du scheduler."""
-    with patch('apscheduler.schedulers.asyncio.AsyncIOScheduler.add_job') as mock_add_job:
-        sync_service.start()
-        
-        # Vérifier que le job quotidien a été ajouté
-        mock_add_job.assert_called()
-        
-        # Si on doit sync immédiatement, vérifier qu'un second job a été ajouté
-        if sync_service._should_sync():
-            assert mock_add_job.call_count == 2 
\ No newline at end of file
+    current_time = datetime(2024, 1, 29, 9)
+    monkeypatch.setattr(sync_service, "_now", lambda: current_time)
+    sync_service.state["last_sync"] = last_sync
+    
+    sync_service.start()
+    scheduler = sync_service.scheduler
+    assert scheduler.running
+    
+    # Seul le job quotidien est ajouté : l'écriture du state n'est planifiée
+    # que lorsqu'elle est différée
+    assert len(scheduler.jobs) == 1
+    (job, trigger), daily_options = scheduler.jobs[0]
+    assert job == sync_service.sync
+    assert {field.name: str(field) for field in trigger.fields}["hour"] == "8"
+    assert daily_options['id'] == 'daily_sync'
+    assert daily_options['misfire_grace_time'] == 24 * 3600
+    assert daily_options['coalesce'] is True
+    assert daily_options['max_instances'] == 1
+    
+    # Si on doit sync immédiatement, le job quotidien démarre tout de suite
+    if expect_immediate:
+        assert daily_options['next_run_time'] == current_time
+    else:
+        assert 'next_run_time' not in daily_options
+
+async def test_save_state_debounced(sync_service, temp_state_file):
+    """Test que les écritures rapprochées du state sont différées."""
+    sync_service.state_file = temp_state_file
+    await sync_service._save_state()
+    assert orjson.loads(temp_state_file.read_bytes())["error_count"] == 0
+
+    assert sync_service.scheduler.jobs == []
+
+    # Une seconde écriture immédiate est seulement marquée comme à faire,
+    # avec une écriture unique planifiée à la fin du délai
+    sync_service.state["error_count"] = 1
+    await sync_service._save_state()
+    assert sync_service._dirty
+    assert orjson.loads(temp_state_file.read_bytes())["error_count"] == 0
+    (flush_job, trigger), flush_options = sync_service.scheduler.jobs[0]
+    assert (flush_job, trigger) == (sync_service._flush_state, 'date')
+    assert flush_options['id'] == 'flush_state'
+    assert flush_options['replace_existing'] is True
+
+    # Le flush écrit le state en attente, sans laisser de fichier temporaire
+    await sync_service._flush_state()
+    assert not sync_service._dirty
+    assert orjson.loads(temp_state_file.read_bytes())["error_count"] == 1
+    assert list(temp_state_file.parent.iterdir()) == [temp_state_file]
+
+async def test_save_state_concurrent(sync_service, temp_state_file):
+    """Test que des sauvegardes simultanées n'écrivent pas en même temps."""
+    sync_service.state["error_count"] = 1
+    await asyncio.gather(*(sync_service._save_state(force=True) for _ in range(5)))
+
+    assert orjson.loads(temp_state_file.read_bytes())["error_count"] == 1
+    assert list(temp_state_file.parent.iterdir()) == [temp_state_file]
+
+def test_stop_flushes_pending_state(sync_service, memory_state):
+    """Test que l'arrêt du service écrit le state en attente."""
+    sync_service.state["error_count"] = 2
+    sync_service._dirty = True
+
+    sync_service.stop()
+
+    assert not sync_service._dirty
+    assert orjson.loads(memory_state["data"])["error_count"] == 2
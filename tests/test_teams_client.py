@@ -1,31 +1,43 @@
 """Test Teams client."""
+import asyncio
 import json
 import unittest
-from unittest.mock import AsyncMock, patch
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
 
 import aiohttp
+from aiohttp import ClientResponseError
 
 from plane_to_teams.teams_client import TeamsClient, TeamsMessage
 
 
-class TestTeamsClient(unittest.TestCase):
+class TestTeamsClient(unittest.IsolatedAsyncioTestCase):
     """Test Teams client."""
 
-    def setUp(self):
-        """Set up test environment."""
-        self.webhook_url = "https://test.com/webhook"
-        self.client = TeamsClient(self.webhook_url)
-        self.message = TeamsMessage(
+    @classmethod
+    def setUpClass(cls):
+        """Set up the message shared by the tests."""
+        cls.webhook_url = "https://test.com/webhook"
+        cls.message = TeamsMessage(
             title="Test Title",
             items=[
                 ("URGENT", "Test Issue", "daaf8056-e88d-40ba-b527-d58f3e518059", "https://test.com/1")
             ]
         )
+        cls.message_dict = cls.message.to_dict()
+
+    def setUp(self):
+        """Set up test environment."""
+        self.client = TeamsClient(self.webhook_url)
+
+    async def asyncTearDown(self):
+        """Close the client session."""
+        await self.client.close()
 
     @patch("aiohttp.ClientSession.post")
     async def test_send_message_success(self, mock_post):
         """Test successful message sending."""
-        mock_response = AsyncMock()
+        mock_response = MagicMock()
         mock_response.status = 200
         mock_post.return_value.__aenter__.return_value = mock_response
 
@@ -35,21 +47,61 @@ class TestTeamsClient(unittest.TestCase):
         args, kwargs = mock_post.call_args
         self.assertEqual(args[0], self.webhook_url)
         self.assertEqual(kwargs["headers"]["Content-Type"], "application/json")
+        self.assertEqual(kwargs["data"], self.message.to_bytes())
 
     @patch("aiohttp.ClientSession.post")
     async def test_send_message_failure(self, mock_post):
         """Test failed message sending."""
-        mock_response = AsyncMock()
+        mock_response = MagicMock()
         mock_response.status = 400
-        mock_response.text = AsyncMock(return_value="Bad Request")
+        mock_response.raise_for_status.side_effect = ClientResponseError(
+            MagicMock(), (), status=400, message="Bad Request"
+        )
         mock_post.return_value.__aenter__.return_value = mock_response
 
         with self.assertRaises(aiohttp.ClientError):
             await self.client.send_message(self.message)
 
+    async def test_max_concurrent(self):
+        """Test that concurrent sends are bounded."""
+        max_concurrent = 2
+        client = TeamsClient(self.webhook_url, max_concurrent=max_concurrent)
+        self.addAsyncCleanup(client.close)
+
+        release = asyncio.Event()
+        in_flight = 0
+        peak = 0
+
+        @asynccontextmanager
+        async def blocking_post(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                await release.wait()
+                yield MagicMock(status=200)
+            finally:
+                in_flight -= 1
+
+        with patch("aiohttp.ClientSession.post", side_effect=blocking_post):
+            sends = [
+                asyncio.create_task(client.send_message(self.message))
+                for _ in range(max_concurrent + 1)
+            ]
+            # Laisser tous les envois démarrer avant de débloquer les requêtes
+            for _ in range(10):
+                await asyncio.sleep(0)
+            self.assertEqual(in_flight, max_concurrent)
+
+            release.set()
+            results = await asyncio.gather(*sends)
+
+        self.assertEqual(results, [True] * (max_concurrent + 1))
+        self.assertEqual(peak, max_concurrent)
+
     def test_message_format(self):
         """Test message formatting."""
-        message_dict = self.message.to_dict()
+        message_dict = self.message_dict
 
         # Verify message structure
         self.assertEqual(message_dict["@type"], "MessageCard")
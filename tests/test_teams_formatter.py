@@ -1,18 +1,45 @@
 """Tests for the Teams message formatter."""
-from datetime import datetime
+from collections import namedtuple
+import os
+import time
 import unittest
 
+import orjson
+
 from plane_to_teams.config import Config
 from plane_to_teams.plane_client import PlaneIssue, PlaneState
-from plane_to_teams.teams_formatter import TeamsMessage, format_issues
+from plane_to_teams.teams_formatter import ACTIVE_STATE_GROUPS, TeamsMessage, format_issues
+
+# Date fixe des issues de test, le formatter n'en tient pas compte
+FIXED_TS = "2024-01-01T00:00:00"
+
+# Issue réduite aux champs lus par format_issues
+_FakeIssue = namedtuple("_FakeIssue", "id name priority state")
+
+# Carte attendue pour le message à une seule issue de test_teams_message_to_dict
+GOLDEN_CARD = {
+    "@type": "MessageCard",
+    "@context": "http://schema.org/extensions",
+    "themeColor": "0076D7",
+    "summary": "Test Title",
+    "title": "🎯 Test Title",
+    "sections": [{
+        "facts": [{
+            "name": "#1",
+            "value": "<span style='color:#ff0000'>[URGENT]</span> [Test Issue](https://test.com/1) - **En cours**"
+        }],
+        "markdown": True
+    }]
+}
 
 
 class TestTeamsFormatter(unittest.TestCase):
     """Test cases for Teams formatter."""
 
-    def setUp(self):
-        """Set up test cases."""
-        self.config = Config(
+    @classmethod
+    def setUpClass(cls):
+        """Set up the test data shared by the test cases."""
+        cls.config = Config(
             plane_api_token="test_token",
             plane_base_url="http://test.url",
             plane_workspace="test_workspace",
@@ -20,7 +47,7 @@ class TestTeamsFormatter(unittest.TestCase):
             teams_webhook_url="http://teams.webhook"
         )
         
-        self.sample_states = [
+        cls.sample_states = [
             PlaneState(
                 id="state1",
                 name="En cours",
@@ -54,111 +81,87 @@ class TestTeamsFormatter(unittest.TestCase):
                 default=False
             )
         ]
+        cls.state_map = {state.id: state for state in cls.sample_states}
         
-        self.sample_issues = [
-            PlaneIssue(
-                id="1",
-                name="Urgent Issue",
-                description_html="<p>Test</p>",
-                priority="urgent",
-                state="state1",  # En cours
-                created_at=datetime.now().isoformat(),
-                updated_at=datetime.now().isoformat(),
-                estimate_point=None,
-                start_date=None,
-                target_date=None,
-                completed_at=None,
-                sequence_id=1,
-                project_id="test",
-                labels=[],
-                assignees=[]
-            ),
-            PlaneIssue(
-                id="2",
-                name="High Priority Issue",
-                description_html="<p>Test</p>",
-                priority="high",
-                state="state2",  # A faire
-                created_at=datetime.now().isoformat(),
-                updated_at=datetime.now().isoformat(),
-                estimate_point=None,
-                start_date=None,
-                target_date=None,
-                completed_at=None,
-                sequence_id=2,
-                project_id="test",
-                labels=[],
-                assignees=[]
-            ),
-            PlaneIssue(
-                id="3",
-                name="Backlog Issue",
-                description_html="<p>Test</p>",
-                priority="medium",  # Changed from urgent to medium
-                state="state3",  # Backlog
-                created_at=datetime.now().isoformat(),
-                updated_at=datetime.now().isoformat(),
-                estimate_point=None,
-                start_date=None,
-                target_date=None,
-                completed_at=datetime.now().isoformat(),
-                sequence_id=3,
-                project_id="test",
-                labels=[],
-                assignees=[]
-            ),
-            PlaneIssue(
-                id="4",
-                name="Completed Issue",
-                description_html="<p>Test</p>",
-                priority="urgent",
-                state="state4",  # Terminé
-                created_at=datetime.now().isoformat(),
-                updated_at=datetime.now().isoformat(),
-                estimate_point=None,
-                start_date=None,
-                target_date=None,
-                completed_at=datetime.now().isoformat(),
-                sequence_id=4,
-                project_id="test",
-                labels=[],
-                assignees=[]
-            )
+        # Une vraie PlaneIssue fixe les attributs lus par le formatter
+        cls.plane_issue = PlaneIssue(
+            id="1",
+            name="Urgent Issue",
+            description_html="<p>Test</p>",
+            priority="urgent",
+            state="state1",  # En cours
+            created_at=FIXED_TS,
+            updated_at=FIXED_TS,
+            estimate_point=None,
+            start_date=None,
+            target_date=None,
+            completed_at=None,
+            sequence_id=1,
+            project_id="test",
+            labels=[],
+            assignees=[]
+        )
+        cls.sample_issues = [
+            _FakeIssue("1", "Urgent Issue", "urgent", "state1"),  # En cours
+            _FakeIssue("2", "High Priority Issue", "high", "state2"),  # A faire
+            _FakeIssue("3", "Backlog Issue", "medium", "state3"),  # Backlog
+            _FakeIssue("4", "Completed Issue", "urgent", "state4")  # Terminé
         ]
+        
+        # Message formaté une seule fois, vérifié par plusieurs tests
+        cls.message = format_issues(cls.sample_issues, cls.state_map, cls.config)
 
     def test_format_issues(self):
         """Test formatting issues into Teams message."""
-        message = format_issues(self.sample_issues, self.sample_states, self.config)
-        
+        message = self.message
         self.assertIsInstance(message, TeamsMessage)
-        self.assertEqual(len(message.items), 3)  # Only issues with states in allowed groups
         
-        # Check first item (urgent + en cours)
+        # Only issues with states in allowed groups, sorted by priority then state
+        # (urgent en cours, then high a faire, then medium backlog)
         priority, name, state, url = message.items[0]
-        self.assertEqual(priority, "URGENT")
-        self.assertEqual(name, "Urgent Issue")
-        self.assertEqual(state, "En cours")
-        self.assertTrue(url.startswith("https://plane.julienfroidefond.com"))
-        self.assertIn(self.config.plane_workspace, url)
-        self.assertIn(self.config.plane_project_id, url)
-        
-        # Check sorting (urgent en cours, then high a faire, then medium backlog)
-        states = [item[2] for item in message.items]
-        self.assertEqual(
-            states,
-            [
-                "En cours",  # state1
-                "A faire",   # state2
-                "Backlog"    # state3
-            ]
-        )
-        
-        # Check priorities are correctly sorted
-        priorities = [item[0] for item in message.items]
+        checks = [
+            ("count", len(message.items), 3),
+            ("first", (priority, name, state), ("URGENT", "Urgent Issue", "En cours")),
+            ("states", [item[2] for item in message.items], ["En cours", "A faire", "Backlog"]),
+            ("priorities", [item[0] for item in message.items], ["URGENT", "HIGH", "MEDIUM"]),
+            ("url", url, "https://plane.julienfroidefond.com/test_workspace/projects/test_project/issues/1"),
+        ]
+        for check, actual, expected in checks:
+            with self.subTest(check):
+                self.assertEqual(actual, expected)
+
+    def test_format_issues_plane_issue(self):
+        """Test formatting a real PlaneIssue gives the same item as the fake one."""
+        message = format_issues([self.plane_issue], self.state_map, self.config)
+
+        self.assertEqual(message.items, self.message.items[:1])
+
+    def test_format_issues_filters_state_groups(self):
+        """Test that only issues in an active state group are kept."""
+        groups_by_name = {state.name: state.group for state in self.sample_states}
+        sample_groups = {self.state_map[issue.state].group for issue in self.sample_issues}
+
+        kept_groups = {groups_by_name[item[2]] for item in self.message.items}
+        self.assertEqual(kept_groups, sample_groups & ACTIVE_STATE_GROUPS)
+        self.assertEqual(sample_groups - kept_groups, {"completed"})
+
+    def test_format_issues_keeps_top_ten(self):
+        """Test that only the ten highest priority issues are kept, in order."""
+        priorities = ["low", "medium", "high", "urgent", "none"]
+        issues = [
+            _FakeIssue(str(i), f"Issue {i}", priorities[i % 5], "state1")
+            for i in range(15)
+        ]
+
+        message = format_issues(issues, self.state_map, self.config)
+
+        self.assertEqual(len(message.items), 10)
         self.assertEqual(
-            priorities,
-            ["URGENT", "HIGH", "MEDIUM"]
+            [item[0] for item in message.items],
+            ["URGENT"] * 3 + ["HIGH"] * 3 + ["MEDIUM"] * 3 + ["LOW"]
         )
+        # Ordre d'origine conservé à priorité égale
+        self.assertEqual([item[1] for item in message.items[:3]], ["Issue 3", "Issue 8", "Issue 13"])
 
     def test_teams_message_to_dict(self):
         """Test Teams message conversion to dict."""
@@ -169,12 +172,81 @@ class TestTeamsFormatter(unittest.TestCase):
             ]
         )
 
-        message_dict = message.to_dict()
+        self.maxDiff = None
+        self.assertEqual(message.to_dict(), GOLDEN_CARD)
+
+    def test_teams_message_to_bytes(self):
+        """Test Teams message serialization matches to_dict."""
+        message = TeamsMessage(
+            title="Test \"Title\"",
+            items=[
+                ("URGENT", "Test Issue", "En cours", "https://test.com/1"),
+                ("LOW", "Autre issue", "À faire", "https://test.com/2")
+            ]
+        )
+
+        self.assertEqual(orjson.loads(message.to_bytes()), message.to_dict())
+
+
+class TestTeamsFormatterPerf(unittest.TestCase):
+    """Check that format_issues scales with the number of issues."""
+
+    SIZES = (10, 1_000, 100_000)
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up states and configuration for the generated issues."""
+        groups = ["started", "unstarted", "backlog", "completed"]
+        states = [
+            PlaneState(
+                id=f"state{i}",
+                name=group.title(),
+                color="#000000",
+                sequence=i,
+                group=group,
+                default=False
+            )
+            for i, group in enumerate(groups)
+        ]
+        cls.state_map = {state.id: state for state in states}
+        cls.config = Config(
+            plane_api_token="test_token",
+            plane_base_url="http://test.url",
+            plane_workspace="test_workspace",
+            plane_project_id="test_project",
+            teams_webhook_url="http://teams.webhook"
+        )
+
+    @staticmethod
+    def _make_issues(n):
+        """Generate n issues cycling through priorities and states."""
+        priorities = ["urgent", "high", "medium", "low", "none"]
+        return [
+            _FakeIssue(str(i), f"Issue {i}", priorities[i % 5], f"state{i % 4}")
+            for i in range(n)
+        ]
+
+    def _best_time(self, issues, repeat=5):
+        """Return the best wall time of format_issues over a few runs."""
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            format_issues(issues, self.state_map, self.config)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def test_format_issues_sizes(self):
+        """Test that the top ten active issues are kept whatever the number of issues."""
+        for n in (10, 1_000):
+            with self.subTest(n=n):
+                message = format_issues(self._make_issues(n), self.state_map, self.config)
+                self.assertEqual(len(message.items), min(10, n - n // 4))
+
+    @unittest.skipUnless(os.environ.get("RUN_PERF_TESTS"), "set RUN_PERF_TESTS=1 to run timing tests")
+    def test_format_issues_scales(self):
+        """Test that format_issues stays well below quadratic time."""
+        timings = {n: self._best_time(self._make_issues(n)) for n in self.SIZES}
 
-        # Verify message structure
-        self.assertEqual(message_dict["@type"], "MessageCard")
-        self.assertEqual(message_dict["@context"], "http://schema.org/extensions")
-        self.assertEqual(message_dict["title"], "🎯 Test Title")
-        self.assertEqual(len(message_dict["sections"]), 1)
-        self.assertEqual(len(message_dict["sections"][0]["facts"]), 1)
-        self.assertTrue(message_dict["sections"][0]["markdown"]) 
\ No newline at end of file
+        # 100 fois plus d'issues : ~100 fois plus long en linéaire,
+        # ~10000 fois en quadratique. La marge absorbe le bruit de mesure.
+        self.assertLess(timings[100_000] / timings[1_000], 1000)